@@ -0,0 +1,65 @@
+"""Add analytics rollup tables
+
+Revision ID: 26280292d546
+Revises: 2f6918799a67
+Create Date: 2026-10-17 13:48:22.519304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '26280292d546'
+down_revision: Union[str, None] = '2f6918799a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_distraction_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('distraction_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('source_app', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', 'distraction_type', 'source_app', name='uq_daily_distraction_stats_key')
+    )
+    op.create_index(op.f('ix_daily_distraction_stats_id'), 'daily_distraction_stats', ['id'], unique=False)
+    op.create_table('hourly_focus_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.SmallInteger(), nullable=False),
+    sa.Column('focus_minutes', sa.Integer(), nullable=False),
+    sa.Column('sessions_completed', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', 'hour', name='uq_hourly_focus_stats_key')
+    )
+    op.create_index(op.f('ix_hourly_focus_stats_id'), 'hourly_focus_stats', ['id'], unique=False)
+    op.create_table('analytics_watermarks',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('refreshed_through', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analytics_watermarks')
+    op.drop_index(op.f('ix_hourly_focus_stats_id'), table_name='hourly_focus_stats')
+    op.drop_table('hourly_focus_stats')
+    op.drop_index(op.f('ix_daily_distraction_stats_id'), table_name='daily_distraction_stats')
+    op.drop_table('daily_distraction_stats')
@@ -0,0 +1,41 @@
+"""Add unique (user_id, session_date) to study sessions
+
+Revision ID: 2f6918799a67
+Revises: 6ed20f6f61c5
+Create Date: 2026-10-17 12:20:13.845067
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6918799a67'
+down_revision: Union[str, None] = '6ed20f6f61c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Daily rollups are upserted on (user_id, session_date); keep one row per day.
+    op.execute(
+        """
+        DELETE FROM study_sessions a
+        USING study_sessions b
+        WHERE a.user_id = b.user_id
+          AND a.session_date = b.session_date
+          AND (a.created_at, a.id) < (b.created_at, b.id)
+        """
+    )
+    op.create_unique_constraint(
+        'uq_study_sessions_user_id_session_date', 'study_sessions', ['user_id', 'session_date']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_study_sessions_user_id_session_date', 'study_sessions', type_='unique')
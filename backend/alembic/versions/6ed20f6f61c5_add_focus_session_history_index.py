@@ -0,0 +1,36 @@
+"""Add keyset index for focus session history
+
+Revision ID: 6ed20f6f61c5
+Revises: a7ebc33d76c5
+Create Date: 2026-10-17 11:02:47.630118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ed20f6f61c5'
+down_revision: Union[str, None] = 'a7ebc33d76c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_focus_sessions_history',
+        'focus_sessions',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_completed = true'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_focus_sessions_history', table_name='focus_sessions',
+                  postgresql_where=sa.text('is_completed = true'))
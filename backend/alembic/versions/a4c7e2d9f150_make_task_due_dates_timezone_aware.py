@@ -0,0 +1,31 @@
+"""Make task due dates timezone-aware
+
+Revision ID: a4c7e2d9f150
+Revises: f2a9c4d81e37
+Create Date: 2026-10-17 21:04:31.228614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2d9f150'
+down_revision: Union[str, None] = 'f2a9c4d81e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('tasks', 'due_date',
+                    type_=sa.DateTime(timezone=True), postgresql_using="due_date AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('tasks', 'due_date',
+                    type_=postgresql.TIMESTAMP(), postgresql_using="due_date AT TIME ZONE 'UTC'")
@@ -0,0 +1,50 @@
+"""Add partial unique index on open focus sessions
+
+Revision ID: a7ebc33d76c5
+Revises: e0975ff168a5
+Create Date: 2026-10-17 09:31:05.527912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7ebc33d76c5'
+down_revision: Union[str, None] = 'e0975ff168a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Close all but the newest open session per user so the unique index can be built.
+    op.execute(
+        """
+        UPDATE focus_sessions fs
+        SET is_completed = true, ended_at = coalesce(fs.ended_at, now())
+        WHERE fs.is_completed = false
+          AND EXISTS (
+              SELECT 1 FROM focus_sessions newer
+              WHERE newer.user_id = fs.user_id
+                AND newer.is_completed = false
+                AND (newer.created_at, newer.id) > (fs.created_at, fs.id)
+          )
+        """
+    )
+    op.create_index(
+        'uq_focus_sessions_user_id_open',
+        'focus_sessions',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text('is_completed = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_focus_sessions_user_id_open', table_name='focus_sessions',
+                  postgresql_where=sa.text('is_completed = false'))
@@ -0,0 +1,63 @@
+"""Rank subtasks lexicographically
+
+Revision ID: b3e1f0a2c7d4
+Revises: 26280292d546
+Create Date: 2026-10-17 16:02:41.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e1f0a2c7d4'
+down_revision: Union[str, None] = '26280292d546'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('subtasks', sa.Column('rank', sa.String(length=255, collation='C'), nullable=True))
+    # Keep the existing order: equal-width decimal positions are valid ranks
+    # and sort the same way; the trailing 'i' leaves room before the next one.
+    op.execute(
+        """
+        UPDATE subtasks s
+        SET rank = lpad(ranked.position::text, 6, '0') || 'i'
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY task_id ORDER BY "order", created_at, id
+            ) AS position
+            FROM subtasks
+        ) ranked
+        WHERE ranked.id = s.id
+        """
+    )
+    op.alter_column('subtasks', 'rank', nullable=False)
+    op.create_index('ix_subtasks_task_id_rank', 'subtasks', ['task_id', 'rank'], unique=False)
+    op.drop_index(op.f('ix_subtasks_task_id'), table_name='subtasks')
+    op.drop_column('subtasks', 'order')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('subtasks', sa.Column('order', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE subtasks s
+        SET "order" = ranked.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY task_id ORDER BY rank, id) - 1 AS position
+            FROM subtasks
+        ) ranked
+        WHERE ranked.id = s.id
+        """
+    )
+    op.alter_column('subtasks', 'order', server_default=None)
+    op.create_index(op.f('ix_subtasks_task_id'), 'subtasks', ['task_id'], unique=False)
+    op.drop_index('ix_subtasks_task_id_rank', table_name='subtasks')
+    op.drop_column('subtasks', 'rank')
@@ -0,0 +1,56 @@
+"""Link focus sessions to tasks and index open tasks for suggestions
+
+Revision ID: c52d8e9a4f16
+Revises: b3e1f0a2c7d4
+Create Date: 2026-10-17 16:41:09.352871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d8e9a4f16'
+down_revision: Union[str, None] = 'b3e1f0a2c7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('focus_sessions', sa.Column('task_id', sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        'focus_sessions_task_id_fkey', 'focus_sessions', 'tasks', ['task_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(
+        'ix_focus_sessions_task_id',
+        'focus_sessions',
+        ['task_id'],
+        unique=False,
+        postgresql_where=sa.text('task_id IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_tasks_next_open',
+        'tasks',
+        [
+            'user_id',
+            sa.text('priority DESC'),
+            sa.text('due_date ASC NULLS LAST'),
+            sa.text('(estimated_pomodoros - completed_pomodoros)'),
+            'id',
+        ],
+        unique=False,
+        postgresql_where=sa.text('is_completed = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_next_open', table_name='tasks', postgresql_where=sa.text('is_completed = false'))
+    op.drop_index('ix_focus_sessions_task_id', table_name='focus_sessions',
+                  postgresql_where=sa.text('task_id IS NOT NULL'))
+    op.drop_constraint('focus_sessions_task_id_fkey', 'focus_sessions', type_='foreignkey')
+    op.drop_column('focus_sessions', 'task_id')
@@ -0,0 +1,53 @@
+"""Add chat conversation index and rolling summaries
+
+Revision ID: d8a4b6e2f931
+Revises: c52d8e9a4f16
+Create Date: 2026-10-17 17:20:33.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4b6e2f931'
+down_revision: Union[str, None] = 'c52d8e9a4f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_chat_messages_conversation',
+        'chat_messages',
+        ['user_id', 'session_id', sa.text('sent_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    # user_id lookups are served by the leading column of the new index.
+    op.drop_index(op.f('ix_chat_messages_user_id'), table_name='chat_messages')
+    op.create_table('chat_summaries',
+    sa.Column('session_id', sa.Uuid(), nullable=False),
+    sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('through_sent_at', sa.DateTime(), nullable=False),
+    sa.Column('through_message_id', sa.Uuid(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'session_id', name='uq_chat_summaries_conversation')
+    )
+    op.create_index(op.f('ix_chat_summaries_id'), 'chat_summaries', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chat_summaries_id'), table_name='chat_summaries')
+    op.drop_table('chat_summaries')
+    op.create_index(op.f('ix_chat_messages_user_id'), 'chat_messages', ['user_id'], unique=False)
+    op.drop_index('ix_chat_messages_conversation', table_name='chat_messages')
@@ -0,0 +1,53 @@
+"""Align focus session and distraction columns with the API
+
+Revision ID: e0975ff168a5
+Revises: 589878b478ba
+Create Date: 2026-10-17 09:12:40.114382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0975ff168a5'
+down_revision: Union[str, None] = '589878b478ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('focus_sessions', 'start_time', new_column_name='started_at',
+                    type_=sa.DateTime(timezone=True), postgresql_using="start_time AT TIME ZONE 'UTC'")
+    op.alter_column('focus_sessions', 'end_time', new_column_name='ended_at',
+                    type_=sa.DateTime(timezone=True), postgresql_using="end_time AT TIME ZONE 'UTC'")
+    op.alter_column('focus_sessions', 'completed', new_column_name='is_completed')
+    op.add_column('focus_sessions', sa.Column('break_duration_minutes', sa.Integer(), server_default='5', nullable=False))
+
+    op.alter_column('distractions', 'name', new_column_name='distraction_type',
+                    type_=sqlmodel.sql.sqltypes.AutoString())
+    op.add_column('distractions', sa.Column('source_app', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('distractions', sa.Column('destination_app', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('distractions', sa.Column('url', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('distractions', sa.Column('occured_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('distractions', 'occured_at')
+    op.drop_column('distractions', 'url')
+    op.drop_column('distractions', 'destination_app')
+    op.drop_column('distractions', 'source_app')
+    op.alter_column('distractions', 'distraction_type', new_column_name='name',
+                    type_=sqlmodel.sql.sqltypes.AutoString(length=100))
+
+    op.drop_column('focus_sessions', 'break_duration_minutes')
+    op.alter_column('focus_sessions', 'is_completed', new_column_name='completed')
+    op.alter_column('focus_sessions', 'ended_at', new_column_name='end_time',
+                    type_=postgresql.TIMESTAMP(), postgresql_using="ended_at AT TIME ZONE 'UTC'")
+    op.alter_column('focus_sessions', 'started_at', new_column_name='start_time',
+                    type_=postgresql.TIMESTAMP(), postgresql_using="started_at AT TIME ZONE 'UTC'")
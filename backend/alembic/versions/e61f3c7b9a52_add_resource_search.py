@@ -0,0 +1,67 @@
+"""Add full-text and trigram search over resources
+
+Revision ID: e61f3c7b9a52
+Revises: d8a4b6e2f931
+Create Date: 2026-10-17 18:05:47.213690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61f3c7b9a52'
+down_revision: Union[str, None] = 'd8a4b6e2f931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('resources', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(notes, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(url, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_resources_search_vector', 'resources', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_resources_title_trgm', 'resources', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index(
+        'ix_resources_user_favorites',
+        'resources',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_favorite = true'),
+    )
+    op.create_index(
+        'ix_resources_user_recent',
+        'resources',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    # user_id lookups are served by the leading column of ix_resources_user_recent.
+    op.drop_index(op.f('ix_resources_user_id'), table_name='resources')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm is left installed; dropping an extension is a database-wide decision.
+    op.create_index(op.f('ix_resources_user_id'), 'resources', ['user_id'], unique=False)
+    op.drop_index('ix_resources_user_recent', table_name='resources')
+    op.drop_index('ix_resources_user_favorites', table_name='resources',
+                  postgresql_where=sa.text('is_favorite = true'))
+    op.drop_index('ix_resources_title_trgm', table_name='resources')
+    op.drop_index('ix_resources_search_vector', table_name='resources')
+    op.drop_column('resources', 'search_vector')
@@ -0,0 +1,47 @@
+"""Make subtask ranks unique within a task
+
+Revision ID: f2a9c4d81e37
+Revises: e61f3c7b9a52
+Create Date: 2026-10-17 19:12:08.540917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c4d81e37'
+down_revision: Union[str, None] = 'e61f3c7b9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent appends may already have produced duplicate ranks. Re-rank
+    # only the affected tasks, keeping their order (ties broken by id).
+    op.execute(
+        """
+        UPDATE subtasks s
+        SET rank = lpad(ranked.position::text, 6, '0') || 'i'
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY task_id ORDER BY rank, id) AS position
+            FROM subtasks
+            WHERE task_id IN (SELECT task_id FROM subtasks GROUP BY task_id, rank HAVING count(*) > 1)
+        ) ranked
+        WHERE ranked.id = s.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_subtasks_task_id_rank', 'subtasks', ['task_id', 'rank'], deferrable=True, initially='IMMEDIATE'
+    )
+    op.drop_index('ix_subtasks_task_id_rank', table_name='subtasks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_subtasks_task_id_rank', 'subtasks', ['task_id', 'rank'], unique=False)
+    op.drop_constraint('uq_subtasks_task_id_rank', 'subtasks', type_='unique')
@@ -1,12 +1,73 @@
-from fastapi import APIRouter, FastAPI, Depends
-from app.api.v1.routers import auth, focus_session
+from contextlib import asynccontextmanager
 
+from fastapi import APIRouter, FastAPI, Depends, Request, status
+from fastapi.responses import JSONResponse
+from prometheus_client import make_asgi_app
+from app.api.v1.routers import analytics, auth, chat, focus_session, resources, tasks
+from app.core.config import settings
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.rate_limit import RateLimitExceeded, retry_after_header
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.db.neondb import dispose_db, init_db
+from app.services.distraction_buffer import distraction_buffer
+from app.services.model_calls import AssistantBusy
+from app.services.session_events import session_events
+from app.services.session_expiry import session_expiry
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    distraction_buffer.start()
+    await session_events.start()
+    if settings.SESSION_EXPIRY_ENABLED:
+        session_expiry.start()
+    yield
+    await session_expiry.stop()
+    await session_events.stop()
+    await distraction_buffer.stop()
+    password_hasher.shutdown()
+    await dispose_db()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(InstrumentationMiddleware)
+app.mount("/metrics", make_asgi_app())
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(AssistantBusy)
+async def assistant_busy_handler(request: Request, exc: AssistantBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Assistant busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many requests"},
+        headers={"Retry-After": retry_after_header(exc)},
+    )
 
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(focus_session.router, prefix="/focussession", tags=["focussession"] )
+app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+app.include_router(chat.router, prefix="/chat", tags=["chat"])
+app.include_router(resources.router, prefix="/resources", tags=["resources"])
 
 
 
@@ -1,10 +1,15 @@
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from _collections_abc import AsyncGenerator
 from app.db.neondb import AsyncSessionLocal
+from app.db.routing import replica_router
 from app.models import User
 from app.core.jwt import decode_access_token
+from app.core.principals import Principal, principal_cache
 
 
 
@@ -17,16 +22,44 @@ async def get_db() -> AsyncGenerator [AsyncSession, None]:
 async def get_current_user(
     token: "str" = Depends(auth_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> Principal:
     
+    # Hot path: a token we already verified and resolved skips both the
+    # signature check and the database.
+    principal = principal_cache.get(token)
+    if principal:
+            db.info["user_id"] = principal.id
+            return principal
+
     payload = decode_access_token(token)
     
     if not payload or "sub" not in payload:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication")
-    user = await db.get(User, payload["sub"])
-    if not user:
+    try:
+            user_id = UUID(payload["sub"])
+    except ValueError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication")
+
+    result = await db.execute(select(User.id, User.username).where(User.id == user_id))
+    row = result.one_or_none()
+    if not row:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+
+    principal = Principal(id=row.id, username=row.username)
+    principal_cache.set(token, principal, token_exp=payload.get("exp"))
+    # Lets the write tracking in app.db.routing pin this user to the primary.
+    db.info["user_id"] = principal.id
+    return principal
+
+
+async def get_read_db(
+    user: Principal = Depends(get_current_user),
+) -> AsyncGenerator [AsyncSession, None]:
+    """Session for read-only endpoints: the replica unless it lags or the user just wrote."""
+    session_factory = await replica_router.read_sessionmaker(user.id)
+    async with session_factory() as session:
+        yield session
+
 
 
 
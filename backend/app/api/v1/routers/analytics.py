@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.instrumentation import query_budget
+from app.api.deps import get_current_user, get_read_db
+from app.core.principals import Principal
+from app.schemas.analytics_schemas import DistractionBreakdownItem, FocusPeriod, HourStat
+from app.services import analytics
+from app.services.analytics import DistractionGroup, Granularity
+
+router = APIRouter()
+
+DEFAULT_RANGE_DAYS = 30
+
+
+def date_range(start: date | None = None, end: date | None = None) -> tuple[date, date]:
+    """Resolve ?start=&end= (inclusive), defaulting to the last 30 days."""
+    end = end or analytics.today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "start must be on or before end")
+    return start, end
+
+
+@router.get("/focus", response_model=list[FocusPeriod], dependencies=[Depends(query_budget(2))])
+async def get_focus_series(
+    granularity: Granularity = "day",
+    dates: tuple[date, date] = Depends(date_range),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    return await analytics.focus_series(db, user.id, *dates, granularity)
+
+
+@router.get("/distractions", response_model=list[DistractionBreakdownItem], dependencies=[Depends(query_budget(4))])
+async def get_distraction_breakdown(
+    group_by: DistractionGroup = "distraction_type",
+    dates: tuple[date, date] = Depends(date_range),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    return await analytics.distraction_breakdown(db, user.id, *dates, group_by)
+
+
+@router.get("/best-hours", response_model=list[HourStat], dependencies=[Depends(query_budget(4))])
+async def get_best_hours(
+    dates: tuple[date, date] = Depends(date_range),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    return await analytics.best_hours(db, user.id, *dates)
@@ -3,57 +3,47 @@ from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.instrumentation import query_budget
 from app.api.deps import get_db
+from app.db.repositories import UniqueViolation, insert_user
 from app.models.user_model import User
-from app.core.security import hash_password, verify_password
+from app.core.rate_limit import login_ip_limiter, login_username_limiter, register_ip_limiter
+from app.core.security import password_hasher
 from app.core.jwt import create_access_token
 from app.schemas.auth_schemas import UserLoginRequest, UserRegisterRequest, TokenResponse, UserResponse
 
 router = APIRouter()
 
+_DUPLICATE_USER_DETAIL = {
+    "ix_users_email": "Email already registered",
+    "ix_users_username": "Username already taken",
+}
 
 
-@router.post("/register", response_model=UserResponse, tags=["auth"])
+@router.post("/register", response_model=UserResponse, tags=["auth"], dependencies=[Depends(register_ip_limiter.per_ip()), Depends(query_budget(1))])
 async def register(
     user_data: UserRegisterRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    # 1. Check if user already exists
-    existing_user = await db.execute(
-        select(User).where(
-            (User.email == user_data.email) | (User.username == user_data.username)
-        )
-    )
-    existing = existing_user.scalar_one_or_none()
-    
-    if existing:
-        if existing.email == user_data.email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
+    # 1. Hash the password (off the event loop)
+    hashed_pwd = await password_hasher.hash(user_data.password)
     
-    # 2. Hash the password
-    hashed_pwd = hash_password(user_data.password)
-    
-    # 3. Create new user
-    new_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=hashed_pwd
-    )
-    
-    # 4. Save to database
-    db.add(new_user)
+    # 2. Insert in one round trip; the unique indexes reject duplicates
+    try:
+        new_user = await insert_user(db, User(
+            email=user_data.email,
+            username=user_data.username,
+            hashed_password=hashed_pwd
+        ))
+    except UniqueViolation as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_DUPLICATE_USER_DETAIL.get(exc.constraint, "Email or username already registered")
+        )
     await db.commit()
-    await db.refresh(new_user)
     
-    # 5. Return success response
+    # 3. Return success response
     return UserResponse(
         id=str(new_user.id),
         username=new_user.username,
@@ -62,35 +52,38 @@ async def register(
     )
 
 
-@router.post("/login", response_model=TokenResponse, tags=["auth"])
+@router.post("/login", response_model=TokenResponse, tags=["auth"], dependencies=[Depends(login_ip_limiter.per_ip()), Depends(query_budget(1))])
 async def login(
     user_data: UserLoginRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    # 1. Find user by username
+    # 1. Throttle guessing against one account from many addresses
+    await login_username_limiter.hit(user_data.username.lower())
+
+    # 2. Find user by username
     result = await db.execute(
         select(User).where(User.username == user_data.username)
     )
     user = result.scalar_one_or_none()
     
-    # 2. Check if user exists
+    # 3. Check if user exists
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
     
-    # 3. Verify password
-    if not verify_password(user_data.password, user.hashed_password):
+    # 4. Verify password
+    if not await password_hasher.verify(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
     
-    # 4. Create access token
+    # 5. Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
-    # 5. Return token
+    # 6. Return token
     return TokenResponse(access_token=access_token)
 
 
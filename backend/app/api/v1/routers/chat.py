@@ -0,0 +1,90 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.instrumentation import query_budget
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.core.principals import Principal
+from app.db.neondb import AsyncSessionLocal
+from app.services import chat
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.serialization import ListSerializer
+from app.schemas.chat_schemas import ChatMessageCreate, ChatMessageResponse, ChatReplyResponse
+
+router = APIRouter()
+
+_message_list = ListSerializer(ChatMessageResponse)
+
+
+# ============ CHAT ENDPOINTS ============
+
+@router.post("/messages", response_model=ChatReplyResponse, status_code=201, dependencies=[Depends(query_budget(5))])
+async def send_message(
+    data: ChatMessageCreate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    """Ask the assistant. The prompt carries a rolling summary and the latest messages, never the whole chat."""
+    session_id = data.session_id or uuid4()
+    messages = await chat.reply(db, user.id, session_id, data.content)
+    return ChatReplyResponse(session_id=session_id, messages=messages)
+
+
+@router.post("/messages/stream", dependencies=[Depends(query_budget(5))])
+async def stream_message(
+    data: ChatMessageCreate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    """
+    Like POST /messages, but the answer arrives as server-sent events while
+    the model writes it: `message`, `delta`..., then `done` or `error`.
+    """
+    # The stream opens its own short sessions; the request's (used by the
+    # auth lookup) must not pin a pooled connection while the model writes.
+    await db.close()
+    session_id = data.session_id or uuid4()
+    events = chat.stream_reply(AsyncSessionLocal, user.id, session_id, data.content)
+    # Run up to the first event here, so a full limiter or a database error
+    # is an ordinary HTTP error response. Once started, the generator's
+    # cleanup (releasing the model slot) runs even if the client never reads.
+    first = await anext(events)
+
+    async def body():
+        yield first
+        async for event in events:
+            yield event
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{session_id}/messages", response_model=list[ChatMessageResponse], dependencies=[Depends(query_budget(2))])
+async def get_messages(
+    session_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    """A conversation newest first. Pass the `X-Next-Cursor` header back as `cursor` for older messages."""
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor, datetime, UUID)
+        except InvalidCursor:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+    result = await db.execute(chat.conversation_window(user.id, session_id, limit + 1, before))
+    messages = result.all()
+    headers = {}
+    if len(messages) > limit:
+        messages = messages[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(messages[-1].sent_at, messages[-1].id)
+    return _message_list.response(messages, headers)
@@ -1,155 +1,379 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, desc
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, desc, delete, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 from uuid import UUID
 
-from app.api.deps import get_db, get_current_user
+from app.core.config import settings
+from app.core.instrumentation import query_budget
+from app.core.rate_limit import distraction_ip_limiter, distraction_user_limiter
+from app.api.deps import get_db, get_current_user, get_read_db
+from app.db.repositories import (
+    UniqueViolation,
+    complete_focus_session,
+    credit_task_pomodoros,
+    insert_focus_session,
+)
+from app.db.routing import reads_primary, replica_router
 from app.models.focus_model import FocusSession
 from app.models.distractions_model import Distraction
-from app.models.user_model import User
+from app.core.principals import Principal
+from app.services.active_sessions import active_session_store
+from app.services.distractions import insert_distractions
+from app.services.session_events import OVERFLOW, format_sse, session_events
+from app.services.session_versions import session_versions
+from app.services.distraction_buffer import distraction_buffer
+from app.services.rollups import apply_rollup_deltas, distraction_delta, session_completion_delta
+from app.services.streaks import apply_streak_deltas
+from app.utils.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.serialization import ListSerializer, schema_columns
 from app.schemas.focus_session_schemas import (
     FocusSessionStart,
     FocusSessionResponse,
     DistractionCreate,
     DistractionResponse,
+    DistractionBatchCreate,
+    DistractionBatchResponse,
 )
 
 router = APIRouter(prefix="/focus-sessions", tags=["Focus Sessions"])
 
+# List endpoints select just the response columns and serialize the rows in
+# one pass instead of returning ORM objects for FastAPI to revalidate.
+_SESSION_COLUMNS = schema_columns(FocusSession, FocusSessionResponse)
+_DISTRACTION_COLUMNS = schema_columns(Distraction, DistractionResponse)
+_session_list = ListSerializer(FocusSessionResponse)
+_distraction_list = ListSerializer(DistractionResponse)
+
+# Cancelling retries when distractions land between its two DELETEs.
+CANCEL_ATTEMPTS = 3
+
 
 # ============ HELPER ============
 
-async def get_active_session(db: AsyncSession, user_id: UUID) -> FocusSession | None:
+async def get_active_session(db: AsyncSession, user_id: UUID) -> FocusSessionResponse | None:
+    """Return the user's open session, consulting the active-session store before the database."""
+    cached = await active_session_store.get(user_id)
+    if cached is not None:
+        return cached
+
     result = await db.execute(
         select(FocusSession).where(
             FocusSession.user_id == user_id,
             FocusSession.is_completed == False
         )
     )
-    return result.scalar_one_or_none()
+    session = result.scalar_one_or_none()
+    if session is None:
+        return None
+    snapshot = FocusSessionResponse.model_validate(session)
+    # A lagging replica can still show a session closed elsewhere as open;
+    # only the primary is trusted to fill the shared store.
+    if reads_primary(db):
+        await active_session_store.set(user_id, snapshot)
+    return snapshot
 
 
 # ============ SESSION ENDPOINTS ============
 
-@router.post("/start", response_model=FocusSessionResponse, status_code=201)
+@router.post("/start", response_model=FocusSessionResponse, status_code=201, dependencies=[Depends(query_budget(2))])
 async def start_session(
     data: FocusSessionStart,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user)
 ):
-    if await get_active_session(db, user.id):
+    # The partial unique index on open sessions is the check; a cached entry
+    # may belong to a session another worker has closed since.
+    try:
+        session = await insert_focus_session(db, FocusSession(
+            user_id=user.id,
+            started_at=datetime.now(timezone.utc),
+            **data.model_dump()
+        ))
+    except UniqueViolation:
+        await db.rollback()
+        await active_session_store.invalidate(user.id)
+        await session_versions.bump(user.id)
         raise HTTPException(400, "Session already active")
-
-    session = FocusSession(
-        user_id=user.id,
-        started_at=datetime.now(timezone.utc),
-        **data.model_dump()
-    )
-    db.add(session)
+    if data.task_id is not None and session.task_id is None:
+        await db.rollback()
+        raise HTTPException(404, "Task not found")
     await db.commit()
-    await db.refresh(session)
-    return session
+
+    snapshot = FocusSessionResponse.model_validate(session)
+    await active_session_store.set(user.id, snapshot)
+    await session_versions.bump(user.id)
+    await session_events.publish(user.id, "session.started", snapshot.model_dump_json())
+    return snapshot
 
 
-@router.patch("/complete", response_model=FocusSessionResponse)
+@router.patch("/complete", response_model=FocusSessionResponse, dependencies=[Depends(query_budget(5))])
 async def complete_session(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user)
 ):
-    session = await get_active_session(db, user.id)
+    session = await complete_focus_session(db, user.id, datetime.now(timezone.utc))
     if not session:
+        await active_session_store.invalidate(user.id)
+        await session_versions.bump(user.id)
         raise HTTPException(404, "No active session")
-
-    session.is_completed = True
-    session.ended_at = datetime.now(timezone.utc)
+    delta = session_completion_delta(session)
+    await apply_rollup_deltas(db, [delta])
+    await apply_streak_deltas(db, [delta])
+    await credit_task_pomodoros(db, [session])
     await db.commit()
-    await db.refresh(session)
+
+    await active_session_store.invalidate(user.id)
+    await session_versions.bump(user.id)
+    await session_events.publish(
+        user.id, "session.completed", FocusSessionResponse.model_validate(session).model_dump_json()
+    )
     return session
 
-@router.delete("/cancel", status_code=204)
+@router.delete("/cancel", status_code=204, dependencies=[Depends(query_budget(5))])
 async def cancel_session(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user)
 ):
-    session = await get_active_session(db, user.id)
-    if not session:
+    active = await get_active_session(db, user.id)
+    if not active:
         raise HTTPException(404, "No Active Session")
     
-    await db.delete(session)
+    distraction_buffer.discard(active.id)
+    for _ in range(CANCEL_ATTEMPTS):
+        try:
+            # Deleted distractions were counted in the daily rollups when they were written.
+            deleted = await db.scalars(
+                delete(Distraction)
+                .where(Distraction.focus_session_id == active.id)
+                .returning(Distraction.occured_at)
+            )
+            removed = [distraction_delta(user.id, occured_at, -1) for occured_at in deleted.all()]
+            result = await db.execute(
+                delete(FocusSession).where(
+                    FocusSession.id == active.id,
+                    FocusSession.user_id == user.id,
+                    FocusSession.is_completed == False
+                )
+            )
+        except IntegrityError:
+            # A buffer flush or a batch committed distractions for this session
+            # after the first DELETE; start over so they are deleted too.
+            await db.rollback()
+            continue
+        break
+    else:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Session is still receiving distractions, retry")
+    if result.rowcount == 0:
+        await db.rollback()
+        await active_session_store.invalidate(user.id)
+        await session_versions.bump(user.id)
+        raise HTTPException(404, "No Active Session")
+    await apply_rollup_deltas(db, removed)
     await db.commit()
+    await active_session_store.invalidate(user.id)
+    await session_versions.bump(user.id)
+    await session_events.publish(user.id, "session.cancelled", active.model_dump_json())
     
     
-@router.get("/active", response_model=FocusSessionResponse)
+@router.get("/active", response_model=FocusSessionResponse, dependencies=[Depends(query_budget(2))])
 async def get_current_session(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user)
 ):
+    # Read on the primary: a miss here fills the active-session store, and
+    # most calls are answered from that store anyway.
+    etag = make_etag(await session_versions.current(user.id), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     session = await get_active_session(db, user.id)
     if not session:
         raise HTTPException(404, "No active Session")
+    response.headers.update(cache_headers(etag))
     return session
 
-@router.get("/history", response_model=list[FocusSessionResponse])
+@router.get("/history", response_model=list[FocusSessionResponse], dependencies=[Depends(query_budget(2))])
 async def get_history(
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(FocusSession)
+    """Completed sessions, newest first. Pass the `X-Next-Cursor` header back as `cursor` for the next page."""
+    etag = make_etag(await session_versions.current(user.id), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    query = (
+        select(*_SESSION_COLUMNS)
         .where(FocusSession.user_id == user.id, FocusSession.is_completed == True )
-        .order_by(FocusSession.created_at.desc())
-        .limit(limit)
+        .order_by(FocusSession.created_at.desc(), FocusSession.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            created_at, session_id = decode_cursor(cursor, datetime, UUID)
+        except InvalidCursor:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+        query = query.where(tuple_(FocusSession.created_at, FocusSession.id) < (created_at, session_id))
+
+    result = await db.execute(query)
+    sessions = result.all()
+    headers = cache_headers(etag)
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(sessions[-1].created_at, sessions[-1].id)
+    return _session_list.response(sessions, headers)
+
+@router.get("/history/export", dependencies=[Depends(query_budget(2))])
+async def export_history(
+    user: Principal = Depends(get_current_user)
+):
+    """Stream the full completed history as NDJSON using a server-side cursor."""
+    query = (
+        select(*_SESSION_COLUMNS)
+        .where(FocusSession.user_id == user.id, FocusSession.is_completed == True )
+        .order_by(FocusSession.created_at.desc(), FocusSession.id.desc())
+        .execution_options(yield_per=500)
+    )
+
+    session_factory = await replica_router.read_sessionmaker(user.id)
+
+    async def rows():
+        # Own session: the stream outlives the request-scoped get_read_db session.
+        async with session_factory() as db:
+            async for row in await db.stream(query):
+                yield FocusSessionResponse.model_validate(row).model_dump_json() + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+@router.get("/events", dependencies=[Depends(query_budget(2))])
+async def stream_events(
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    """
+    Server-sent events for the user's sessions: a `snapshot` of the active
+    session (or null) first, then `session.started`, `session.completed`,
+    `session.cancelled`, `session.expired`, `distraction.logged` and
+    `distraction.batch` as they happen. The stream ends after `resync` when the client fell too far
+    behind; reconnecting yields a fresh snapshot.
+    """
+    # Subscribe before reading the snapshot so no event falls in between.
+    subscription = session_events.subscribe(user.id)
+    try:
+        snapshot = await get_active_session(db, user.id)
+    except BaseException:
+        subscription.close()
+        raise
+    # An idle stream must not pin a pooled connection.
+    await db.close()
+
+    async def events():
+        try:
+            yield format_sse("snapshot", snapshot.model_dump_json() if snapshot else "null")
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.SESSION_EVENTS_HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is OVERFLOW:
+                    yield format_sse("resync", "null")
+                    return
+                yield format_sse(event.type, event.data)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return result.scalars().all()
 
 #Distractions Tracking/logging Endpoints
 
-@router.post("/distractions", response_model=DistractionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/distractions", response_model=DistractionResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(distraction_ip_limiter.per_ip()), Depends(query_budget(2))])
 async def log_distraction(
     data: DistractionCreate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user)
 ):
+    await distraction_user_limiter.hit(str(user.id))
     session = await get_active_session(db, user.id)
     if not session:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "No active session")
     
-    distraction = Distraction(
-        focus_session_id = session.id,
-        occured_at = datetime.now(timezone.utc),
-        **data.model_dump()
-    )
-    db.add(distraction)
-    await db.commit()
-    await db.refresh(distraction)
+    # Acknowledge immediately; the buffer writes it behind the request. The
+    # write lands on the primary, so keep this user's reads there too.
+    replica_router.mark_write(user.id)
+    distraction = DistractionResponse.model_validate(distraction_buffer.add(user.id, session.id, data))
+    await session_events.publish(user.id, "distraction.logged", distraction.model_dump_json())
     return distraction
 
-@router.get("/distractions", response_model = list[DistractionResponse])
+@router.post("/distractions/batch", response_model=DistractionBatchResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(distraction_ip_limiter.per_ip()), Depends(query_budget(4))])
+async def log_distractions_batch(
+    data: DistractionBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    await distraction_user_limiter.hit(str(user.id), cost=len(data.items))
+    session = await get_active_session(db, user.id)
+    if not session:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No active session")
+
+    distractions = await insert_distractions(db, session.id, data.items)
+    await apply_rollup_deltas(db, [distraction_delta(user.id, d.occured_at) for d in distractions])
+    await db.commit()
+    await session_events.publish(
+        user.id, "distraction.batch", json.dumps({"focus_session_id": str(session.id), "inserted": len(distractions)})
+    )
+    return DistractionBatchResponse(
+        focus_session_id=session.id,
+        inserted=len(distractions),
+        items=[DistractionResponse.model_validate(d) for d in distractions],
+    )
+
+@router.get("/distractions", response_model = list[DistractionResponse], dependencies=[Depends(query_budget(3))])
 async def get_distractions(
     session_id: UUID | None = None,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
 ):
     if session_id:
         result = await db.execute(
-            select(FocusSession).where(
+            select(FocusSession.id).where(
                 FocusSession.id == session_id,
                 FocusSession.user_id == user.id
             )
         )
         if not result.scalar_one_or_none():
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
-        query = select(Distraction).where(Distraction.focus_session_id == session_id)
     else:
         session = await get_active_session(db, user.id)
         if not session:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "No active session")
-        query = select(Distraction).where(Distraction.focus_session_id == session.id)
-        
-    result = await db.execute(query.order_by(Distraction.occured_at))
-    return result.scalars().all()
+        session_id = session.id
+
+    # Make buffered events for this session visible before reading. The
+    # flush's own statements are outside this endpoint's budget.
+    await distraction_buffer.flush(session_id)
+    result = await db.execute(
+        select(*_DISTRACTION_COLUMNS)
+        .where(Distraction.focus_session_id == session_id)
+        .order_by(Distraction.occured_at)
+    )
+    return _distraction_list.response(result.all())
 
 
 
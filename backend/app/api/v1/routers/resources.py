@@ -0,0 +1,122 @@
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, cast, func, literal, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.instrumentation import query_budget
+from app.api.deps import get_current_user, get_read_db
+from app.core.principals import Principal
+from app.models.resource_model import SEARCH_CONFIG, Resource
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.serialization import ListSerializer, schema_columns
+from app.schemas.resource_schemas import ResourceResponse, ResourceSearchResult
+
+router = APIRouter()
+
+_RESOURCE_COLUMNS = schema_columns(Resource, ResourceResponse)
+_resource_list = ListSerializer(ResourceResponse)
+_search_results = ListSerializer(ResourceSearchResult)
+_SEARCH_CONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+# Lowest word_similarity for a title match; pg_trgm's default of 0.6 misses
+# transpositions in short words ("pyhton" scores about 0.43 against "Python").
+WORD_SIMILARITY_THRESHOLD = 0.3
+
+
+def _decode(cursor: str, *types: type) -> tuple:
+    try:
+        return decode_cursor(cursor, *types)
+    except InvalidCursor:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+
+# ============ RESOURCE ENDPOINTS ============
+
+@router.get("", response_model=list[ResourceResponse], dependencies=[Depends(query_budget(3))])
+async def list_resources(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    """
+    The library, favorites first and then everything else, newest first
+    within each. Pass the `X-Next-Cursor` header back as `cursor` for the
+    next page.
+    """
+    after = _decode(cursor, bool, datetime, UUID) if cursor else None
+
+    def page(favorites: bool, size: int):
+        query = (
+            select(*_RESOURCE_COLUMNS)
+            .where(Resource.user_id == user.id, Resource.is_favorite == favorites)
+            .order_by(Resource.created_at.desc(), Resource.id.desc())
+            .limit(size)
+        )
+        if after is not None and after[0] == favorites:
+            query = query.where(tuple_(Resource.created_at, Resource.id) < after[1:])
+        return query
+
+    # Two index range scans instead of one sort over the whole library.
+    rows = []
+    if after is None or after[0]:
+        rows = (await db.execute(page(True, limit + 1))).all()
+    if len(rows) <= limit:
+        rows += (await db.execute(page(False, limit + 1 - len(rows)))).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.is_favorite, last.created_at, last.id)
+    return _resource_list.response(rows, headers)
+
+
+@router.get("/search", response_model=list[ResourceSearchResult], dependencies=[Depends(query_budget(3))])
+async def search_resources(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    """
+    Resources matching `q` by full text (title, notes, url; web-search
+    syntax) or by a similar word in the title, which tolerates typos.
+    Favorites come first, then the best scores. Paginate with
+    `X-Next-Cursor` as on the library listing.
+    """
+    tsquery = func.websearch_to_tsquery(_SEARCH_CONFIG, q)
+    # ts_rank_cd normalized to 0..1 (flag 32) plus the similarity (0..1) of
+    # `q` to its closest stretch of the title, so one misspelled word in a
+    # long title still scores as close.
+    score = cast(
+        func.ts_rank_cd(Resource.search_vector, tsquery, 32) + func.word_similarity(q, Resource.title), Float
+    )
+
+    query = (
+        select(*_RESOURCE_COLUMNS, score.label("score"))
+        .where(
+            Resource.user_id == user.id,
+            # Either side is answered by its GIN index; Postgres ORs the bitmaps.
+            Resource.search_vector.op("@@")(tsquery) | literal(q).op("<%")(Resource.title),
+        )
+        .order_by(Resource.is_favorite.desc(), score.desc(), Resource.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(tuple_(Resource.is_favorite, score, Resource.id) < _decode(cursor, bool, float, UUID))
+
+    # `<%` reads its threshold from this setting; it lasts until the transaction ends.
+    await db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(WORD_SIMILARITY_THRESHOLD), True))
+    )
+    result = await db.execute(query)
+    rows = result.all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.is_favorite, last.score, last.id)
+    return _search_results.response(rows, headers)
@@ -0,0 +1,375 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import String, Uuid, column, delete, func, select, text, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.instrumentation import query_budget
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.core.principals import Principal
+from app.models.subtask_model import Subtask
+from app.models.task_model import Task
+from app.utils.ranking import InvalidRank, rank_between, spread_ranks
+from app.utils.serialization import ListSerializer
+from app.schemas.task_schemas import (
+    NextTaskResponse,
+    SubtaskCreate,
+    SubtaskMove,
+    SubtaskResponse,
+    SubtaskUpdate,
+    TaskCreate,
+    TaskResponse,
+    TaskUpdate,
+)
+
+router = APIRouter()
+
+# Task trees load in two statements whatever their size: the tasks, then
+# every subtask of those tasks in one `IN` query, already in rank order.
+_WITH_SUBTASKS = selectinload(Task.subtasks)
+_task_list = ListSerializer(TaskResponse)
+_next_task_list = ListSerializer(NextTaskResponse)
+
+_REMAINING_POMODOROS = Task.estimated_pomodoros - Task.completed_pomodoros
+# Most important first, then soonest due, then closest to done. Matches the
+# partial index `ix_tasks_next_open` column for column, so the query is an
+# index scan that stops after `limit` rows.
+NEXT_TASK_ORDER = (
+    Task.priority.desc(),
+    Task.due_date.asc().nulls_last(),
+    _REMAINING_POMODOROS.asc(),
+    Task.id.asc(),
+)
+
+# A rank longer than this (many moves into one gap, long runs of appends)
+# makes the write respace the whole task's ranks first.
+MAX_RANK_LENGTH = 32
+# Attempts at writing a rank that a concurrent append or move also took.
+RANK_ATTEMPTS = 3
+
+
+# ============ HELPER ============
+
+def owned_task_ids(task_id: UUID, user_id: UUID):
+    """Subquery matching `task_id` only if `user_id` owns it, for single-statement subtask writes."""
+    return select(Task.id).where(Task.id == task_id, Task.user_id == user_id)
+
+
+async def respace_subtask_ranks(db: AsyncSession, task_id: UUID, user_id: UUID) -> dict[UUID, str]:
+    """
+    Rewrite the task's subtask ranks, in their current order, as short evenly
+    spaced ones and return them by id. The rows stay locked until the
+    caller's commit, which is also when rank uniqueness is checked.
+    """
+    await db.execute(text("SET CONSTRAINTS uq_subtasks_task_id_rank DEFERRED"))
+    result = await db.scalars(
+        select(Subtask.id)
+        .where(Subtask.task_id.in_(owned_task_ids(task_id, user_id)))
+        .order_by(Subtask.rank, Subtask.id)
+        .with_for_update()
+    )
+    ids = result.all()
+    ranks = dict(zip(ids, spread_ranks(len(ids))))
+    if ranks:
+        new_ranks = values(column("id", Uuid), column("rank", String), name="new_ranks").data(list(ranks.items()))
+        await db.execute(
+            update(Subtask)
+            .where(Subtask.id == new_ranks.c.id)
+            .values(rank=new_ranks.c.rank)
+            .execution_options(synchronize_session=False)
+        )
+    return ranks
+
+
+# ============ TASK ENDPOINTS ============
+
+@router.get("", response_model=list[TaskResponse], dependencies=[Depends(query_budget(3))])
+async def list_tasks(
+    completed: bool | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    """The user's tasks with their subtasks: open first, then by priority and due date."""
+    query = (
+        select(Task)
+        .where(Task.user_id == user.id)
+        .options(_WITH_SUBTASKS)
+        .order_by(
+            Task.is_completed,
+            Task.priority.desc(),
+            Task.due_date.asc().nulls_last(),
+            Task.created_at,
+            Task.id,
+        )
+        .limit(limit)
+    )
+    if completed is not None:
+        query = query.where(Task.is_completed == completed)
+    result = await db.scalars(query)
+    return _task_list.response(result.all())
+
+
+@router.post("", response_model=TaskResponse, status_code=201, dependencies=[Depends(query_budget(3))])
+async def create_task(
+    data: TaskCreate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    task = Task(user_id=user.id, **data.model_dump(exclude={"subtasks"}))
+    task.subtasks = [
+        Subtask(title=subtask.title, rank=rank)
+        for subtask, rank in zip(data.subtasks, spread_ranks(len(data.subtasks)))
+    ]
+    db.add(task)
+    await db.commit()
+    return task
+
+
+@router.get("/next", response_model=list[NextTaskResponse], dependencies=[Depends(query_budget(2))])
+async def next_tasks(
+    limit: int = Query(default=3, ge=1, le=20),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    """Open tasks to suggest when starting a focus session, best candidate first."""
+    result = await db.execute(
+        select(
+            Task.id,
+            Task.title,
+            Task.priority,
+            Task.due_date,
+            Task.estimated_pomodoros,
+            Task.completed_pomodoros,
+            _REMAINING_POMODOROS.label("remaining_pomodoros"),
+        )
+        .where(Task.user_id == user.id, Task.is_completed == False)
+        .order_by(*NEXT_TASK_ORDER)
+        .limit(limit)
+    )
+    return _next_task_list.response(result.all())
+
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[Depends(query_budget(3))])
+async def get_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_user)
+):
+    task = await db.scalar(
+        select(Task).where(Task.id == task_id, Task.user_id == user.id).options(_WITH_SUBTASKS)
+    )
+    if not task:
+        raise HTTPException(404, "Task not found")
+    return task
+
+
+@router.patch("/{task_id}", response_model=TaskResponse, dependencies=[Depends(query_budget(3))])
+async def update_task(
+    task_id: UUID,
+    data: TaskUpdate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    changes = data.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No fields to update")
+
+    # UPDATE ... RETURNING loads the task; its subtasks follow in one query.
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user.id)
+        .values(**changes)
+        .returning(Task)
+    )
+    result = await db.scalars(
+        select(Task)
+        .from_statement(statement)
+        .options(_WITH_SUBTASKS)
+        .execution_options(populate_existing=True)
+    )
+    task = result.one_or_none()
+    if not task:
+        raise HTTPException(404, "Task not found")
+    await db.commit()
+    return task
+
+
+@router.delete("/{task_id}", status_code=204, dependencies=[Depends(query_budget(3))])
+async def delete_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    await db.execute(delete(Subtask).where(Subtask.task_id.in_(owned_task_ids(task_id, user.id))))
+    result = await db.execute(delete(Task).where(Task.id == task_id, Task.user_id == user.id))
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(404, "Task not found")
+    await db.commit()
+
+
+# ============ SUBTASK ENDPOINTS ============
+
+@router.post(
+    "/{task_id}/subtasks",
+    response_model=SubtaskResponse,
+    status_code=201,
+    # 3, plus 3 when the task's ranks are respaced.
+    dependencies=[Depends(query_budget(6))],
+)
+async def create_subtask(
+    task_id: UUID,
+    data: SubtaskCreate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    """Append a subtask after the task's current last one."""
+    last_rank = (
+        select(func.max(Subtask.rank)).where(Subtask.task_id == Task.id).scalar_subquery()
+    )
+    for _ in range(RANK_ATTEMPTS):
+        result = await db.execute(
+            select(Task.id, last_rank).where(Task.id == task_id, Task.user_id == user.id)
+        )
+        row = result.one_or_none()
+        if not row:
+            raise HTTPException(404, "Task not found")
+
+        rank = rank_between(row[1], None)
+        if len(rank) > MAX_RANK_LENGTH:
+            ranks = await respace_subtask_ranks(db, task_id, user.id)
+            rank = rank_between(list(ranks.values())[-1], None)
+
+        subtask = Subtask(task_id=task_id, title=data.title, rank=rank)
+        db.add(subtask)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent append took the rank; the next read sees it as the last one.
+            await db.rollback()
+            continue
+        return subtask
+    raise HTTPException(status.HTTP_409_CONFLICT, "Subtasks are being added concurrently, retry")
+
+
+@router.patch(
+    "/{task_id}/subtasks/{subtask_id}",
+    response_model=SubtaskResponse,
+    dependencies=[Depends(query_budget(2))],
+)
+async def update_subtask(
+    task_id: UUID,
+    subtask_id: UUID,
+    data: SubtaskUpdate,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    changes = data.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "No fields to update")
+
+    subtask = await db.scalar(
+        update(Subtask)
+        .where(
+            Subtask.id == subtask_id,
+            Subtask.task_id.in_(owned_task_ids(task_id, user.id)),
+        )
+        .values(**changes)
+        .returning(Subtask)
+    )
+    if not subtask:
+        raise HTTPException(404, "Subtask not found")
+    await db.commit()
+    return subtask
+
+
+@router.post(
+    "/{task_id}/subtasks/{subtask_id}/move",
+    response_model=SubtaskResponse,
+    # 3, plus 3 when the task's ranks are respaced.
+    dependencies=[Depends(query_budget(6))],
+)
+async def move_subtask(
+    task_id: UUID,
+    subtask_id: UUID,
+    data: SubtaskMove,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    """
+    Reorder by giving the subtask a rank between its new neighbours. Only the
+    moved row is written, unless the ranks have grown long enough to be
+    respaced; a 409 means the client's view of the list is stale.
+    """
+    neighbour_ids = {data.after_id, data.before_id} - {None}
+    if subtask_id in neighbour_ids:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "A subtask cannot be its own neighbour")
+
+    taken: str | None = None
+    for _ in range(RANK_ATTEMPTS):
+        ranks: dict[UUID, str] = {}
+        if neighbour_ids:
+            result = await db.execute(
+                select(Subtask.id, Subtask.rank).where(
+                    Subtask.id.in_(neighbour_ids),
+                    Subtask.task_id.in_(owned_task_ids(task_id, user.id)),
+                )
+            )
+            ranks = dict(result.all())
+            if len(ranks) != len(neighbour_ids):
+                raise HTTPException(404, "Neighbouring subtask not found")
+
+        low, high = ranks.get(data.after_id), ranks.get(data.before_id)
+        if taken is not None and (low is None or low < taken) and (high is None or taken < high):
+            # A concurrent move put another subtask at this rank; go just before it.
+            high = taken
+        try:
+            rank = rank_between(low, high)
+        except InvalidRank:
+            raise HTTPException(status.HTTP_409_CONFLICT, "Neighbours are out of order, reload the task")
+        if len(rank) > MAX_RANK_LENGTH:
+            ranks = await respace_subtask_ranks(db, task_id, user.id)
+            rank = rank_between(ranks.get(data.after_id), ranks.get(data.before_id))
+
+        try:
+            subtask = await db.scalar(
+                update(Subtask)
+                .where(
+                    Subtask.id == subtask_id,
+                    Subtask.task_id.in_(owned_task_ids(task_id, user.id)),
+                )
+                .values(rank=rank)
+                .returning(Subtask)
+            )
+            if not subtask:
+                await db.rollback()
+                raise HTTPException(404, "Subtask not found")
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            taken = rank
+            continue
+        return subtask
+    raise HTTPException(status.HTTP_409_CONFLICT, "Subtasks are being reordered concurrently, retry")
+
+
+@router.delete("/{task_id}/subtasks/{subtask_id}", status_code=204, dependencies=[Depends(query_budget(2))])
+async def delete_subtask(
+    task_id: UUID,
+    subtask_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_user)
+):
+    result = await db.execute(
+        delete(Subtask).where(
+            Subtask.id == subtask_id,
+            Subtask.task_id.in_(owned_task_ids(task_id, user.id)),
+        )
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(404, "Subtask not found")
+    await db.commit()
@@ -8,10 +8,110 @@ class ModeEnum(str, Enum):
     production = "production"
     testing = "testing"
 
+class PasswordHashExecutor(str, Enum):
+    thread = "thread"
+    process = "process"
+
+class SessionEventBrokerKind(str, Enum):
+    memory = "memory"
+    postgres = "postgres"
+
 class Settings(BaseSettings):
     MODE: ModeEnum = ModeEnum.development
-    DATABASE_URL: str
+    DATABASE_URL: str | None = None  # required once an engine is created, not at import
+    DATABASE_REPLICA_URL: str | None = None
     SECRET_KEY: str = "your-secret-key"
+
+    # Database engine / connection pool
+    DB_ECHO: bool | None = None  # None: echo SQL only in development
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, gt=0)
+    DB_POOL_RECYCLE_SECONDS: int = 300
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, ge=0)
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Per-request query/latency instrumentation
+    SERVER_TIMING_ENABLED: bool = True
+    QUERY_BUDGET_ENFORCE: bool | None = None  # None: enforce only in testing
+
+    # Read-replica routing for GET endpoints
+    READ_YOUR_WRITES_SECONDS: float = Field(default=5.0, ge=0)
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=2.0, ge=0)
+    REPLICA_LAG_CHECK_SECONDS: float = Field(default=5.0, gt=0)
+
+    # Password hashing worker pool (bcrypt is CPU bound, keep it off the event loop)
+    PASSWORD_HASH_EXECUTOR: PasswordHashExecutor = PasswordHashExecutor.thread
+    PASSWORD_HASH_WORKERS: int = Field(default=4, ge=1)
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64, ge=1)
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = Field(default=2, ge=1)
+
+    # Token-bucket rate limits, "<count>/<second|minute|hour|day>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # only behind a proxy that sets X-Forwarded-For
+    RATE_LIMIT_SHARDS: int = Field(default=64, ge=1)
+    RATE_LIMIT_MAX_KEYS: int = Field(default=100_000, ge=1)
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_PER_USERNAME: str = "5/minute"
+    RATE_LIMIT_REGISTER_PER_IP: str = "5/minute"
+    RATE_LIMIT_DISTRACTIONS_PER_IP: str = "1200/minute"
+    RATE_LIMIT_DISTRACTIONS_PER_USER: str = "600/minute"
+
+    # Verified-token -> principal cache used by get_current_user
+    PRINCIPAL_CACHE_MAX_SIZE: int = Field(default=10_000, ge=1)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = Field(default=60.0, gt=0)
+
+    # Write-through cache of each user's open focus session. It and the session
+    # versions below are per process and learn of other workers' writes through
+    # the session event broker: use SESSION_EVENTS_BROKER=postgres with more
+    # than one worker.
+    ACTIVE_SESSION_CACHE_MAX_SIZE: int = Field(default=50_000, ge=1)
+    ACTIVE_SESSION_CACHE_TTL_SECONDS: float = Field(default=30.0, gt=0)
+
+    # Per-user focus-session version behind the ETags on session reads
+    SESSION_VERSION_CACHE_MAX_SIZE: int = Field(default=50_000, ge=1)
+    SESSION_VERSION_TTL_SECONDS: float = Field(default=30.0, gt=0)
+
+    # Write-behind buffer in front of the distractions table
+    DISTRACTION_BUFFER_MAX_BATCH: int = Field(default=500, ge=1)
+    DISTRACTION_BUFFER_FLUSH_SECONDS: float = Field(default=1.0, gt=0)
+    DISTRACTION_BUFFER_SPILL_PATH: str = "distraction_spill.jsonl"
+    # Rows the database rejected (bad data), kept for inspection instead of being retried
+    DISTRACTION_BUFFER_QUARANTINE_PATH: str = "distraction_quarantine.jsonl"
+
+    # Live session event stream (SSE); "postgres" relays events between workers via LISTEN/NOTIFY
+    SESSION_EVENTS_BROKER: SessionEventBrokerKind = SessionEventBrokerKind.memory
+    SESSION_EVENTS_CHANNEL: str = "session_events"
+    SESSION_EVENTS_QUEUE_SIZE: int = Field(default=100, ge=1)
+    SESSION_EVENTS_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0)
+
+    # Background expiry of focus sessions abandoned by their client
+    SESSION_EXPIRY_ENABLED: bool = True
+    SESSION_EXPIRY_INTERVAL_SECONDS: float = Field(default=60.0, gt=0)
+    SESSION_EXPIRY_GRACE_MINUTES: float = Field(default=15.0, ge=0)
+    SESSION_EXPIRY_BATCH_SIZE: int = Field(default=500, ge=1)
+
+    # AI study assistant (pydantic-ai model name; "test" is a local stub that needs no API key)
+    CHAT_MODEL: str = "test"
+    CHAT_CONTEXT_MESSAGES: int = Field(default=20, ge=1)  # recent messages always sent verbatim
+    CHAT_SUMMARY_BATCH: int = Field(default=20, ge=1)  # older messages folded into the summary at a time
+    CHAT_SUMMARY_MAX_CHARS: int = Field(default=4_000, ge=1)
+    CHAT_CONTEXT_MESSAGE_MAX_CHARS: int = Field(default=4_000, ge=1)  # per message, when building context
+    CHAT_SUMMARY_CACHE_MAX_SIZE: int = Field(default=10_000, ge=1)
+    CHAT_SUMMARY_CACHE_TTL_SECONDS: float = Field(default=600.0, gt=0)
+    CHAT_STREAM_PERSIST_SECONDS: float = Field(default=1.0, gt=0)  # how often a streamed answer is saved
+
+    # Outbound model calls: concurrency caps and a cache of answers to identical prompts
+    CHAT_MAX_CONCURRENT_CALLS: int = Field(default=16, ge=1)
+    CHAT_MAX_CONCURRENT_CALLS_PER_USER: int = Field(default=1, ge=1)
+    CHAT_CALL_QUEUE_SECONDS: float = Field(default=10.0, ge=0)  # wait for a free slot before answering 503
+    CHAT_BUSY_RETRY_AFTER_SECONDS: int = Field(default=5, ge=1)
+    CHAT_RESPONSE_CACHE_MAX_SIZE: int = Field(default=1_000, ge=0)  # 0 disables the cache
+    CHAT_RESPONSE_CACHE_TTL_SECONDS: float = Field(default=3600.0, gt=0)
+
+    # IANA timezone that decides which calendar day activity counts towards
+    ACTIVITY_TIMEZONE: str = "UTC"
     
     model_config = SettingsConfigDict(
         case_sensitive=True, 
@@ -20,4 +120,3 @@ class Settings(BaseSettings):
     )
 
 settings = Settings()
-
@@ -0,0 +1,215 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import ModeEnum, settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    """Database work attributed to one request (times in seconds)."""
+    method: str = ""
+    route: str = "unmatched"
+    status: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    handler_time: float = 0.0
+    query_budget: int | None = None
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised before the statement that would take a request over its query budget."""
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+_captures: list[list[RequestMetrics]] = []
+
+
+def _enforce_budgets() -> bool:
+    if settings.QUERY_BUDGET_ENFORCE is None:
+        return settings.MODE == ModeEnum.testing
+    return settings.QUERY_BUDGET_ENFORCE
+
+
+def query_budget(max_queries: int):
+    """
+    Route dependency declaring how many SQL statements the endpoint may issue,
+    including the `get_current_user` lookup on a principal-cache miss.
+
+    Overruns are logged and counted; with QUERY_BUDGET_ENFORCE (the default in
+    testing mode) the offending statement raises QueryBudgetExceeded instead.
+    """
+    def dependency(request: Request) -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.route = request.scope["route"].path
+            metrics.query_budget = max_queries
+    return dependency
+
+
+@contextmanager
+def capture_requests() -> Iterator[list[RequestMetrics]]:
+    """Collect the metrics of every request that finishes inside the block (for tests)."""
+    captured: list[RequestMetrics] = []
+    _captures.append(captured)
+    try:
+        yield captured
+    finally:
+        _captures.remove(captured)
+
+
+@contextmanager
+def untracked() -> Iterator[None]:
+    """Statements inside the block are not charged to the current request (e.g. a long-lived stream's periodic writes)."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+# ============ PROMETHEUS ============
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time until the response finished", ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "db_queries_per_request", "SQL statements issued per request", ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55),
+)
+REQUEST_DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request", ["method", "route"],
+)
+REQUEST_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent acquiring pooled connections per request", ["method", "route"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total", "Requests that issued more SQL statements than their budget", ["method", "route"],
+)
+
+
+def _observe(metrics: RequestMetrics) -> None:
+    labels = (metrics.method, metrics.route)
+    REQUEST_DURATION.labels(*labels, str(metrics.status)).observe(time.perf_counter() - metrics.started_at)
+    REQUEST_QUERIES.labels(*labels).observe(metrics.queries)
+    REQUEST_DB_TIME.labels(*labels).observe(metrics.db_time)
+    REQUEST_POOL_WAIT.labels(*labels).observe(metrics.pool_wait)
+    if metrics.query_budget is not None and metrics.queries > metrics.query_budget:
+        QUERY_BUDGET_EXCEEDED.labels(*labels).inc()
+        logger.warning(
+            "%s %s issued %d queries (budget %d)",
+            metrics.method, metrics.route, metrics.queries, metrics.query_budget,
+        )
+    for captured in _captures:
+        captured.append(metrics)
+
+
+def _server_timing(metrics: RequestMetrics) -> bytes:
+    return (
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries", '
+        f"pool;dur={metrics.pool_wait * 1000:.1f}, "
+        f"app;dur={metrics.handler_time * 1000:.1f}"
+    ).encode("latin-1")
+
+
+# ============ MIDDLEWARE ============
+
+class InstrumentationMiddleware:
+    """
+    Pure ASGI middleware that scopes a RequestMetrics to each HTTP request,
+    adds a `Server-Timing` header and feeds the Prometheus histograms once
+    the response body is complete.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = RequestMetrics(method=scope["method"])
+        token = _current.set(metrics)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # The router stores the matched route on the (shared) scope;
+                # its path template keeps label cardinality bounded.
+                route = scope.get("route")
+                if route is not None and hasattr(route, "path"):
+                    metrics.route = route.path
+                metrics.status = message["status"]
+                metrics.handler_time = time.perf_counter() - metrics.started_at
+                if settings.SERVER_TIMING_ENABLED:
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", _server_timing(metrics))]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                _observe(metrics)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+
+# ============ ENGINE HOOKS ============
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that charges connection checkout time to the current request."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if (metrics := _current.get()) is not None:
+                metrics.pool_wait += time.perf_counter() - started
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement the engine executes against the current request."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        metrics = _current.get()
+        if metrics is None:
+            return
+        metrics.queries += 1
+        if metrics.query_budget is not None and metrics.queries > metrics.query_budget and _enforce_budgets():
+            raise QueryBudgetExceeded(
+                f"{metrics.method} {metrics.route} exceeded its budget of {metrics.query_budget} queries"
+            )
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _stop_timer(conn)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        if exception_context.connection is not None:
+            _stop_timer(exception_context.connection)
+
+
+def _stop_timer(conn) -> None:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if (metrics := _current.get()) is not None:
+        metrics.db_time += elapsed
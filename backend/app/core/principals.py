@@ -0,0 +1,90 @@
+import threading
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.user_model import User
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Lightweight authenticated identity, enough to authorize without loading the User row."""
+    id: UUID
+    username: str
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU cache of verified tokens -> Principal.
+
+    Entries never outlive the token's own `exp` claim, and every token issued
+    for a user can be dropped at once through `invalidate_user`.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries: TTLCache[str, Principal] = TTLCache(max_size, ttl_seconds, on_evict=self._forget)
+        self._tokens_by_user: dict[UUID, set[str]] = {}
+        # Invalidation can fire from ORM events running in a worker thread.
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Principal | None:
+        with self._lock:
+            return self._entries.get(token)
+
+    def set(self, token: str, principal: Principal, token_exp: float | None = None) -> None:
+        ttl = self._entries.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if (previous := self._entries.pop(token)) is not None:
+                self._forget(token, previous)
+            self._entries.set(token, principal, ttl)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _forget(self, token: str, principal: Principal) -> None:
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# ============ INVALIDATION HOOKS ============
+# ORM-level updates/deletes of a User drop its cached principals. Bulk
+# `update(User)`/`delete(User)` statements bypass these events and must call
+# `principal_cache.invalidate_user` themselves.
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.utils.ttl_cache import TTLCache
+
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True, slots=True)
+class Rate:
+    """Bucket of `capacity` tokens refilled continuously at `refill_per_second`."""
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rate":
+        """Parse "<count>/<second|minute|hour|day>", e.g. "10/minute" (a burst of 10, refilled over a minute)."""
+        try:
+            count, unit = spec.strip().split("/")
+            capacity = float(count)
+            seconds = _UNIT_SECONDS[unit.strip().removesuffix("s")]
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate {spec!r}, expected e.g. '10/minute'") from None
+        if capacity <= 0:
+            raise ValueError(f"Invalid rate {spec!r}, count must be positive")
+        return cls(capacity, capacity / seconds)
+
+
+class RateLimitExceeded(Exception):
+    """A bucket is empty; `retry_after` is when enough tokens will have refilled."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucketBackend(Protocol):
+    """
+    Storage for token buckets. `take` atomically removes `cost` tokens and
+    returns 0, or leaves the bucket untouched and returns the seconds until
+    it could. A shared implementation (e.g. a Redis Lua script) can replace
+    the in-memory one so limits hold across workers.
+    """
+
+    async def take(self, key: str, rate: Rate, cost: float) -> float: ...
+
+
+class InMemoryTokenBuckets:
+    """
+    Per-process buckets, split across `shards` independently locked TTL
+    caches so limiter checks from threadpool dependencies do not contend on
+    one lock. A bucket's entry expires once it would have refilled, and idle
+    buckets are evicted oldest first; a missing bucket is a full one, so
+    eviction only ever errs towards allowing a request.
+    """
+
+    def __init__(self, shards: int, max_keys: int):
+        max_keys_per_shard = max(1, max_keys // shards)
+        self._shards = [(threading.Lock(), TTLCache(max_keys_per_shard, 0.0)) for _ in range(shards)]
+
+    async def take(self, key: str, rate: Rate, cost: float) -> float:
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, updated_at = buckets.get(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated_at) * rate.refill_per_second)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate.refill_per_second
+            buckets.set(key, (tokens, now), (rate.capacity - tokens) / rate.refill_per_second)
+        return wait
+
+
+class RateLimiter:
+    """A named limit; keys are namespaced by name so limiters can share a backend."""
+
+    def __init__(self, name: str, rate: Rate, backend: TokenBucketBackend):
+        self.name = name
+        self.rate = rate
+        self.backend = backend
+
+    async def hit(self, key: str, cost: float = 1) -> None:
+        """Spend `cost` tokens (capped at the bucket size) or raise RateLimitExceeded."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        wait = await self.backend.take(f"{self.name}:{key}", self.rate, min(cost, self.rate.capacity))
+        if wait > 0:
+            raise RateLimitExceeded(wait)
+
+    def per_ip(self):
+        """Route dependency charging one token to the client address."""
+        async def dependency(request: Request) -> None:
+            await self.hit(client_ip(request))
+        return dependency
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def retry_after_header(exc: RateLimitExceeded) -> str:
+    return str(max(1, math.ceil(exc.retry_after)))
+
+
+rate_limit_backend: TokenBucketBackend = InMemoryTokenBuckets(
+    shards=settings.RATE_LIMIT_SHARDS,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+)
+
+login_ip_limiter = RateLimiter("login-ip", Rate.parse(settings.RATE_LIMIT_LOGIN_PER_IP), rate_limit_backend)
+login_username_limiter = RateLimiter(
+    "login-username", Rate.parse(settings.RATE_LIMIT_LOGIN_PER_USERNAME), rate_limit_backend
+)
+register_ip_limiter = RateLimiter("register-ip", Rate.parse(settings.RATE_LIMIT_REGISTER_PER_IP), rate_limit_backend)
+distraction_ip_limiter = RateLimiter(
+    "distractions-ip", Rate.parse(settings.RATE_LIMIT_DISTRACTIONS_PER_IP), rate_limit_backend
+)
+distraction_user_limiter = RateLimiter(
+    "distractions-user", Rate.parse(settings.RATE_LIMIT_DISTRACTIONS_PER_USER), rate_limit_backend
+)
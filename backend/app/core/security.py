@@ -1,4 +1,14 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 import bcrypt
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import PasswordHashExecutor, settings
+
+T = TypeVar("T")
 
 
 def hash_password(password: str) -> str:
@@ -13,4 +23,113 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
\ No newline at end of file
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+# ============ ASYNC HASHING SERVICE ============
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be retried later."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+# ============ PROMETHEUS ============
+
+HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time a hashing call waited for a pool worker", ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Time bcrypt itself took per call", ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2),
+)
+HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "Hashing calls queued or running")
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hashing calls refused with 503 because the queue was full", ["operation"],
+)
+
+
+def _timed_call(fn: Callable[..., T], *args) -> tuple[T, float, float]:
+    # Runs inside the worker; monotonic() is system-wide on Linux so the
+    # timestamps are comparable with the submitting process.
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded worker pool so the event loop stays responsive.
+
+    At most `max_pending` calls may be queued or running at once; beyond that
+    `PasswordHasherBusy` is raised immediately instead of growing the queue.
+    Queue wait, bcrypt time, in-flight calls and rejections are exported on
+    `/metrics`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        retry_after: int,
+        executor: PasswordHashExecutor = PasswordHashExecutor.thread,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.executor_kind = executor
+        self._in_flight = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == PasswordHashExecutor.process:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, operation: str, fn: Callable[..., T], *args) -> T:
+        if self._in_flight >= self.max_pending:
+            HASH_REJECTED.labels(operation).inc()
+            raise PasswordHasherBusy(self.retry_after)
+
+        self._in_flight += 1
+        HASH_IN_FLIGHT.inc()
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+            HASH_IN_FLIGHT.dec()
+
+        HASH_QUEUE_WAIT.labels(operation).observe(max(started - submitted, 0.0))
+        HASH_DURATION.labels(operation).observe(finished - started)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
@@ -11,7 +11,8 @@ from app.models.reflection_model import Reflection
 from app.models.feedback_model import Feedback
 from app.models.resource_model import Resource
 from app.models.distractions_model import Distraction
-from app.models.chatmessage_model import ChatMessage
+from app.models.chatmessage_model import ChatMessage, ChatSummary
+from app.models.analytics_model import DailyDistractionStat, HourlyFocusStat, AnalyticsWatermark
 
 # Export the metadata for Alembic
 Base = SQLModel
\ No newline at end of file
@@ -1,42 +1,101 @@
-import os
-import asyncio
 import ssl
-from sqlalchemy import text
-from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.config import settings
+from uuid import uuid4
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from app.core.config import ModeEnum, settings
+from app.core.instrumentation import TimedQueuePool, instrument_engine
 
-load_dotenv()
-
-def get_engine():
-    url = settings.DATABASE_URL
+def get_engine(url: str | None = None) -> AsyncEngine:
+    """Build an async engine from settings; `url` defaults to DATABASE_URL."""
+    url = url or settings.DATABASE_URL
+    if not url:
+        raise RuntimeError("DATABASE_URL is not set")
+    db_url = make_url(url)
     connect_args = {}
     
-    # Handle SSL for asyncpg (Neon requires SSL)
-    if "sslmode=" in url:
-        url = url.replace("sslmode=require", "").replace("?sslmode=require", "").replace("&sslmode=require", "")
+    # Handle SSL for asyncpg (Neon requires SSL); asyncpg takes an SSLContext, not sslmode
+    if db_url.query.get("sslmode") in ("require", "prefer"):
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
         connect_args["ssl"] = ssl_context
-    
-    return create_async_engine(
-        url,
-        echo=True,
-        pool_size=5,
-        max_overflow=10,
+    db_url = db_url.difference_update_query(["sslmode"])
+
+    if settings.DB_PGBOUNCER_MODE:
+        # Transaction-pooling proxies (PgBouncer, Neon's -pooler endpoint) hand each
+        # transaction a different server connection, so named prepared statements
+        # cannot be cached or reused.
+        db_url = db_url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        db_url = db_url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        )
+
+    echo = settings.DB_ECHO
+    if echo is None:
+        echo = settings.MODE == ModeEnum.development
+
+    engine = create_async_engine(
+        db_url,
+        echo=echo,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        # Neon closes idle connections; recycle before that and ping on checkout
+        # so the first request after a quiet period doesn't fail.
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
         connect_args=connect_args,
     )
+    instrument_engine(engine)
+    return engine
 
-engine = get_engine()
+# Engines are created by `init_db` (the app lifespan, or a CLI's entry
+# point), not at import, so importing the app needs neither a DATABASE_URL
+# nor the SSL/driver setup. The session factories exist from the start and
+# are bound once the engines do.
+engine: AsyncEngine | None = None
+# Optional read replica; without one, reads share the primary engine.
+replica_engine: AsyncEngine | None = None
 
 AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+def init_db() -> AsyncEngine:
+    """Create the engines and bind the session factories. Idempotent; returns the primary engine."""
+    global engine, replica_engine
+    if engine is None:
+        primary = get_engine()
+        replica_engine = get_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+        engine = primary
+        AsyncSessionLocal.configure(bind=engine)
+        AsyncReadSessionLocal.configure(bind=replica_engine or engine)
+    return engine
+
+
+async def dispose_db() -> None:
+    """Close every pooled connection and unbind the session factories."""
+    global engine, replica_engine
+    for created in (replica_engine, engine):
+        if created is not None:
+            await created.dispose()
+    engine = replica_engine = None
+    AsyncSessionLocal.configure(bind=None)
+    AsyncReadSessionLocal.configure(bind=None)
+
+
 # Optional: Function to test connection (call it from an endpoint, not here)
 async def test_connection():
-    async with engine.begin() as conn:
-        print("Database connected successfully!")
\ No newline at end of file
+    async with init_db().begin() as conn:
+        print("Database connected successfully!")
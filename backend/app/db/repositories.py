@@ -0,0 +1,111 @@
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Integer, Uuid, cast, column, func, insert, literal, select, update, values
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.focus_model import FocusSession
+from app.models.task_model import Task
+from app.models.user_model import User
+
+# Write paths issue exactly one statement and rely on the database's unique
+# constraints rather than SELECT-before-INSERT checks. Callers own the commit
+# and must roll back after a UniqueViolation.
+
+
+class UniqueViolation(Exception):
+    """An INSERT hit a unique constraint; `constraint` names it when the driver reports it."""
+
+    def __init__(self, constraint: str | None):
+        super().__init__(constraint)
+        self.constraint = constraint
+
+
+_UNIQUE_VIOLATION = "23505"
+
+
+def _unique_violation(exc: IntegrityError) -> UniqueViolation:
+    """Translate a unique-key IntegrityError; anything else (e.g. a foreign key) propagates."""
+    # asyncpg's exception, carrying sqlstate and constraint name, is the cause
+    # of the DBAPI error SQLAlchemy wraps.
+    driver_exc = exc.orig.__cause__
+    sqlstate = getattr(driver_exc, "sqlstate", None)
+    if sqlstate is not None and sqlstate != _UNIQUE_VIOLATION:
+        raise exc
+    return UniqueViolation(getattr(driver_exc, "constraint_name", None))
+
+
+async def insert_user(db: AsyncSession, user: User) -> User:
+    """INSERT ... RETURNING the new user. Raises UniqueViolation on a taken email or username."""
+    try:
+        return await db.scalar(insert(User).values(**user.model_dump()).returning(User))
+    except IntegrityError as exc:
+        raise _unique_violation(exc) from exc
+
+
+async def insert_focus_session(db: AsyncSession, session: FocusSession) -> FocusSession:
+    """
+    INSERT ... RETURNING a new session.
+
+    Raises UniqueViolation when the user already has an open session (the
+    partial unique index `uq_focus_sessions_user_id_open`). A `task_id` that
+    is not one of the user's open tasks is stored as NULL by the same
+    statement; callers compare it with what they asked for.
+    """
+    row = session.model_dump()
+    if session.task_id is not None:
+        row["task_id"] = (
+            select(Task.id)
+            .where(Task.id == session.task_id, Task.user_id == session.user_id, Task.is_completed == False)
+            .scalar_subquery()
+        )
+    try:
+        return await db.scalar(insert(FocusSession).values(**row).returning(FocusSession))
+    except IntegrityError as exc:
+        raise _unique_violation(exc) from exc
+
+
+async def complete_focus_session(db: AsyncSession, user_id: UUID, ended_at: datetime) -> FocusSession | None:
+    """
+    Close the user's open session with a single UPDATE ... RETURNING.
+
+    `actual_duration` (whole minutes) is computed in SQL from `started_at`, so
+    no prior read is needed. Returns None when nothing was open.
+    """
+    ended = literal(ended_at, DateTime(timezone=True))
+    actual_duration = cast(func.round(func.extract("epoch", ended - FocusSession.started_at) / 60), Integer)
+    return await db.scalar(
+        update(FocusSession)
+        .where(FocusSession.user_id == user_id, FocusSession.is_completed == False)
+        .values(is_completed=True, ended_at=ended, actual_duration=actual_duration)
+        .returning(FocusSession)
+    )
+
+
+async def credit_task_pomodoros(db: AsyncSession, sessions: Iterable[FocusSession]) -> None:
+    """
+    Add one completed pomodoro to the linked task of every completed focus
+    session, in a single UPDATE ... FROM (VALUES ...).
+
+    The increment happens in SQL (`completed_pomodoros + n`), so concurrent
+    completions never lose an update. The caller owns the commit.
+    """
+    counts = Counter(
+        (session.task_id, session.user_id)
+        for session in sessions
+        if session.task_id is not None and session.session_type == "focus"
+    )
+    if not counts:
+        return
+    credits = values(
+        column("task_id", Uuid), column("user_id", Uuid), column("n", Integer), name="credits"
+    ).data([(task_id, user_id, n) for (task_id, user_id), n in counts.items()])
+    await db.execute(
+        update(Task)
+        .where(Task.id == credits.c.task_id, Task.user_id == credits.c.user_id)
+        .values(completed_pomodoros=Task.completed_pomodoros + credits.c.n)
+        .execution_options(synchronize_session=False)
+    )
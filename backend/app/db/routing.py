@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.neondb import AsyncReadSessionLocal, AsyncSessionLocal
+
+# Replay lag in seconds; 0 when the replica has applied everything it received
+# (so an idle primary doesn't look like lag) or when connected to a primary.
+_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+
+class ReplicaRouter:
+    """
+    Chooses the session factory for read-only requests.
+
+    Reads go to the replica unless the user wrote within `sticky_seconds`
+    (read-your-writes) or the replica's replay lag, sampled at most every
+    `lag_check_interval` seconds, exceeds `max_lag_seconds`.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: async_sessionmaker[AsyncSession] | None,
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        lag_check_interval: float,
+        max_tracked_users: int = 100_000,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.max_tracked_users = max_tracked_users
+        self._last_write: OrderedDict[UUID, float] = OrderedDict()
+        self._replica_ok = True
+        self._lag_checked_at = float("-inf")
+        self._lag_lock = asyncio.Lock()
+
+    def mark_write(self, user_id: UUID) -> None:
+        self._last_write[user_id] = time.monotonic()
+        self._last_write.move_to_end(user_id)
+        while len(self._last_write) > self.max_tracked_users:
+            self._last_write.popitem(last=False)
+
+    def is_sticky(self, user_id: UUID) -> bool:
+        wrote_at = self._last_write.get(user_id)
+        if wrote_at is None:
+            return False
+        if time.monotonic() - wrote_at > self.sticky_seconds:
+            del self._last_write[user_id]
+            return False
+        return True
+
+    async def replica_healthy(self) -> bool:
+        if time.monotonic() - self._lag_checked_at < self.lag_check_interval:
+            return self._replica_ok
+        async with self._lag_lock:
+            if time.monotonic() - self._lag_checked_at < self.lag_check_interval:
+                return self._replica_ok
+            try:
+                async with self.replica() as session:
+                    lag = await session.scalar(_LAG_SQL)
+                self._replica_ok = float(lag) <= self.max_lag_seconds
+            except Exception:
+                self._replica_ok = False
+            self._lag_checked_at = time.monotonic()
+        return self._replica_ok
+
+    async def read_sessionmaker(self, user_id: UUID | None) -> async_sessionmaker[AsyncSession]:
+        if self.replica is None:
+            return self.primary
+        if user_id is not None and self.is_sticky(user_id):
+            return self.primary
+        if not await self.replica_healthy():
+            return self.primary
+        return self.replica
+
+
+def reads_primary(session: AsyncSession) -> bool:
+    """Whether `session` is bound to the primary, as every session is without a replica."""
+    return session.bind is not None and session.bind is AsyncSessionLocal.kw.get("bind")
+
+
+replica_router = ReplicaRouter(
+    primary=AsyncSessionLocal,
+    replica=AsyncReadSessionLocal if settings.DATABASE_REPLICA_URL else None,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.REPLICA_LAG_CHECK_SECONDS,
+)
+
+
+# ============ WRITE TRACKING ============
+# get_current_user tags the request's session with `info["user_id"]`; any
+# INSERT/UPDATE/DELETE on it makes that user sticky to the primary once the
+# transaction commits.
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_user_write(session: Session) -> None:
+    if session.info.pop("wrote", False) and (user_id := session.info.get("user_id")):
+        replica_router.mark_write(user_id)
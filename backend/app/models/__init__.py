@@ -1,27 +1,54 @@
-from .base_model import BaseUUIDModel
-from .user_model import User
-from .focus_model import FocusSession
-from .distractions_model import Distraction
-from .session_model import StudySession
-from .task_model import Task
-from .subtask_model import Subtask
-from .streak_model import Streak
-from .reflection_model import Reflection
-from .feedback_model import Feedback
-from .resource_model import Resource
-from .chatmessage_model import ChatMessage
-
-__all__ = [
-    "BaseUUIDModel",
-    "User",
-    "FocusSession",
-    "Distraction",
-    "StudySession",
-    "Task",
-    "Subtask",
-    "Streak",
-    "Reflection",
-    "Feedback",
-    "Resource",
-    "ChatMessage",
-]
\ No newline at end of file
+"""
+Table models, imported on first use.
+
+`from app.models import User` loads only the module defining `User`, so
+code that touches a few tables does not pay for defining all of them.
+Relationships name their targets as strings, so before SQLAlchemy
+configures the mappers (on the first query or instantiation) every model
+module is imported; `import_all_models` does the same on demand, e.g. for
+Alembic's metadata.
+"""
+import importlib
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+_MODEL_MODULES = {
+    "BaseUUIDModel": "base_model",
+    "User": "user_model",
+    "FocusSession": "focus_model",
+    "Distraction": "distractions_model",
+    "StudySession": "session_model",
+    "Task": "task_model",
+    "Subtask": "subtask_model",
+    "Streak": "streak_model",
+    "Reflection": "reflection_model",
+    "Feedback": "feedback_model",
+    "Resource": "resource_model",
+    "ChatMessage": "chatmessage_model",
+    "ChatSummary": "chatmessage_model",
+    "DailyDistractionStat": "analytics_model",
+    "HourlyFocusStat": "analytics_model",
+    "AnalyticsWatermark": "analytics_model",
+}
+
+__all__ = list(_MODEL_MODULES)
+
+
+def __getattr__(name: str):
+    module = _MODEL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def import_all_models() -> None:
+    for module in set(_MODEL_MODULES.values()):
+        importlib.import_module(f".{module}", __name__)
+
+
+@event.listens_for(Mapper, "before_configured")
+def _register_all_models() -> None:
+    import_all_models()
@@ -0,0 +1,46 @@
+from sqlalchemy import SmallInteger, UniqueConstraint
+from sqlmodel import SQLModel, Field
+from uuid import UUID
+from datetime import date
+
+from .base_model import BaseUUIDModel
+
+# Precomputed aggregates behind the analytics API. Rows only cover closed
+# days (up to the watermark in `analytics_watermarks`) and are rebuilt
+# incrementally by `app.services.analytics.refresh_analytics`.
+
+class DailyDistractionStatBase(SQLModel):
+    day: date
+    distraction_type: str
+    source_app: str = Field(default="")  # "" stands for "unknown" so it can be part of the key
+    count: int = Field(default=0)
+
+class DailyDistractionStat(BaseUUIDModel, DailyDistractionStatBase, table=True):
+    __tablename__ = "daily_distraction_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "distraction_type", "source_app", name="uq_daily_distraction_stats_key"),
+    )
+
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
+
+
+class HourlyFocusStatBase(SQLModel):
+    day: date
+    hour: int = Field(sa_type=SmallInteger)  # 0-23, local to ACTIVITY_TIMEZONE
+    focus_minutes: int = Field(default=0)
+    sessions_completed: int = Field(default=0)
+
+class HourlyFocusStat(BaseUUIDModel, HourlyFocusStatBase, table=True):
+    __tablename__ = "hourly_focus_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "hour", name="uq_hourly_focus_stats_key"),
+    )
+
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
+
+
+class AnalyticsWatermark(SQLModel, table=True):
+    __tablename__ = "analytics_watermarks"
+
+    name: str = Field(primary_key=True)
+    refreshed_through: date
@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import Index, UniqueConstraint, text
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 from datetime import datetime
@@ -16,6 +17,36 @@ class ChatMessageBase(SQLModel):
 
 class ChatMessage(BaseUUIDModel, ChatMessageBase, table=True):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Keyset windows over one conversation, newest first: the last N
+        # messages of a chat are read without touching the rest of it.
+        Index(
+            "ix_chat_messages_conversation",
+            "user_id",
+            "session_id",
+            text("sent_at DESC"),
+            text("id DESC"),
+        ),
+    )
 
-    user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
-    user: "User" = Relationship(back_populates="chat_messages")
\ No newline at end of file
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
+    user: "User" = Relationship(back_populates="chat_messages")
+
+
+# Rolling summary of the part of a conversation that no longer fits in the
+# model's context window; maintained by `app.services.chat`.
+
+class ChatSummaryBase(SQLModel):
+    session_id: UUID
+    summary: str = Field(default="")
+    # Sort key (sent_at, id) of the newest message folded into `summary`.
+    through_sent_at: datetime
+    through_message_id: UUID
+
+class ChatSummary(BaseUUIDModel, ChatSummaryBase, table=True):
+    __tablename__ = "chat_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "session_id", name="uq_chat_summaries_conversation"),
+    )
+
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import DateTime
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .base_model import BaseUUIDModel
 
@@ -9,8 +10,15 @@ if TYPE_CHECKING:
     from .focus_model import FocusSession
 
 class DistractionBase(SQLModel):
-    name: str = Field(max_length=100)
+    distraction_type: str  # "tab_switch" | "app_switch" | "idle" | "blocked_site"
+    source_app: str | None = None
+    destination_app: str | None = None
+    url: str | None = None
     duration_seconds: int | None = None
+    occured_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
 
 class Distraction(BaseUUIDModel, DistractionBase, table=True):
     __tablename__ = "distractions"
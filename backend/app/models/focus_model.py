@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import DateTime, Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 from datetime import datetime
@@ -11,17 +12,43 @@ if TYPE_CHECKING:
 
 class FocusSessionBase(SQLModel):
     duration_minutes: int = Field(default=25)
+    break_duration_minutes: int = Field(default=5)
     session_type: str = Field(default="focus")  # "focus" | "break"
-    start_time: datetime | None = None
-    end_time: datetime | None = None
+    started_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    ended_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
     actual_duration: int | None = None
-    completed: bool = Field(default=False)
+    is_completed: bool = Field(default=False)
 
 class FocusSession(BaseUUIDModel, FocusSessionBase, table=True):
     __tablename__ = "focus_sessions"
+    __table_args__ = (
+        # At most one open session per user; also serves the active-session lookup.
+        Index(
+            "uq_focus_sessions_user_id_open",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_completed = false"),
+        ),
+        # Keyset pagination of completed history: (user_id, created_at, id) newest first.
+        Index(
+            "ix_focus_sessions_history",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_completed = true"),
+        ),
+        # Only linked sessions are indexed; serves ON DELETE SET NULL from tasks.
+        Index(
+            "ix_focus_sessions_task_id",
+            "task_id",
+            postgresql_where=text("task_id IS NOT NULL"),
+        ),
+    )
 
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
     user: "User" = Relationship(back_populates="focus_sessions")
+    # The task this pomodoro works towards; completing it credits the task.
+    task_id: UUID | None = Field(default=None, foreign_key="tasks.id", ondelete="SET NULL")
     distractions: list["Distraction"] = Relationship(
         back_populates="focus_session", 
         sa_relationship_kwargs={"cascade": "all, delete"}
@@ -1,4 +1,6 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 
@@ -7,6 +9,9 @@ from .base_model import BaseUUIDModel
 if TYPE_CHECKING:
     from .user_model import User
 
+# Text search configuration of `Resource.search_vector`; queries must use the same one.
+SEARCH_CONFIG = "english"
+
 class ResourceBase(SQLModel):
     title: str = Field(max_length=255)
     url: str | None = None
@@ -16,6 +21,41 @@ class ResourceBase(SQLModel):
 
 class Resource(BaseUUIDModel, ResourceBase, table=True):
     __tablename__ = "resources"
+    __table_args__ = (
+        # Full-text matches on title (weight A), notes (B) and url (C).
+        Index("ix_resources_search_vector", "search_vector", postgresql_using="gin"),
+        # Typo-tolerant title matches with pg_trgm's word-similarity `<%` operator.
+        Index(
+            "ix_resources_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Library listing, favorites first: the favorites come off this
+        # partial index, the rest off ix_resources_user_recent.
+        Index(
+            "ix_resources_user_favorites",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_favorite = true"),
+        ),
+        Index("ix_resources_user_recent", "user_id", text("created_at DESC"), text("id DESC")),
+    )
 
-    user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
-    user: "User" = Relationship(back_populates="resources")
\ No newline at end of file
+    user_id: UUID = Field(foreign_key="users.id", nullable=False)
+    user: "User" = Relationship(back_populates="resources")
+    # Maintained by Postgres; never written by the application.
+    search_vector: str | None = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(notes, '')), 'B') || "
+                f"setweight(to_tsvector('simple', coalesce(url, '')), 'C')",
+                persisted=True,
+            ),
+        ),
+    )
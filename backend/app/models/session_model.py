@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 from datetime import date
@@ -18,6 +19,10 @@ class StudySessionBase(SQLModel):
 
 class StudySession(BaseUUIDModel, StudySessionBase, table=True):
     __tablename__ = "study_sessions"
+    __table_args__ = (
+        # One rollup row per user per day; target of the rollup upserts.
+        UniqueConstraint("user_id", "session_date", name="uq_study_sessions_user_id_session_date"),
+    )
 
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
     user: "User" = Relationship(back_populates="study_sessions")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import String, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 
@@ -10,10 +11,22 @@ if TYPE_CHECKING:
 class SubtaskBase(SQLModel):
     title: str = Field(max_length=255)
     is_completed: bool = Field(default=False)
-    order: int = Field(default=0)
+    # Lexicographic position within the task (see app.utils.ranking); "C"
+    # collation so the database sorts ranks bytewise like Python does.
+    rank: str = Field(max_length=255, sa_type=String(255, collation="C"))
 
 class Subtask(BaseUUIDModel, SubtaskBase, table=True):
     __tablename__ = "subtasks"
+    __table_args__ = (
+        # One subtask per position, so concurrent appends and moves cannot
+        # share a rank. Deferrable so respacing a task's ranks can pass
+        # through duplicates within its transaction. Its index also serves
+        # loading a task's subtasks in order, finding the last rank and
+        # lookups by task_id alone.
+        UniqueConstraint(
+            "task_id", "rank", name="uq_subtasks_task_id_rank", deferrable=True, initially="IMMEDIATE"
+        ),
+    )
 
-    task_id: UUID = Field(foreign_key="tasks.id", nullable=False, index=True)
+    task_id: UUID = Field(foreign_key="tasks.id", nullable=False)
     task: "Task" = Relationship(back_populates="subtasks")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import TYPE_CHECKING
+from sqlalchemy import DateTime, Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from uuid import UUID
 from datetime import datetime
@@ -13,14 +14,30 @@ class TaskBase(SQLModel):
     title: str = Field(max_length=255)
     description: str | None = None
     priority: int = Field(default=1, ge=1, le=5)  # 1-5 scale
-    due_date: datetime | None = None
+    due_date: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
     is_completed: bool = Field(default=False)
     estimated_pomodoros: int | None = None
     completed_pomodoros: int = Field(default=0)
 
 class Task(BaseUUIDModel, TaskBase, table=True):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # "Next task" suggestions: a user's open tasks in suggestion order
+        # (see NEXT_TASK_ORDER in the tasks router), read straight off the index.
+        Index(
+            "ix_tasks_next_open",
+            "user_id",
+            text("priority DESC"),
+            text("due_date ASC NULLS LAST"),
+            text("(estimated_pomodoros - completed_pomodoros)"),
+            "id",
+            postgresql_where=text("is_completed = false"),
+        ),
+    )
 
     user_id: UUID = Field(foreign_key="users.id", nullable=False, index=True)
     user: "User" = Relationship(back_populates="tasks")
-    subtasks: list["Subtask"] = Relationship(back_populates="task", sa_relationship_kwargs={"cascade": "all, delete"})
\ No newline at end of file
+    subtasks: list["Subtask"] = Relationship(
+        back_populates="task",
+        sa_relationship_kwargs={"cascade": "all, delete", "order_by": "[Subtask.rank, Subtask.id]"}
+    )
\ No newline at end of file
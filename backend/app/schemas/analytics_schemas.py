@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import date
+
+
+class FocusPeriod(BaseModel):
+    """Focus totals for one day/week/month bucket"""
+    period_start: date
+    focus_minutes: int
+    break_minutes: int
+    sessions_completed: int
+    distraction_count: int
+
+
+class DistractionBreakdownItem(BaseModel):
+    """Distraction count for one distraction_type or source_app"""
+    key: str | None
+    count: int
+
+
+class HourStat(BaseModel):
+    """Focus totals for one hour of the day (0-23)"""
+    hour: int
+    focus_minutes: int
+    sessions_completed: int
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from uuid import UUID
+
+
+# ============ CHAT SCHEMAS ============
+
+class ChatMessageCreate(BaseModel):
+    """A message to the assistant; omit `session_id` to start a new conversation"""
+    content: str = Field(min_length=1, max_length=4000)
+    session_id: UUID | None = None
+
+
+class ChatMessageResponse(BaseModel):
+    """Response for one stored chat message"""
+    id: UUID
+    session_id: UUID
+    role: str
+    content: str
+    sent_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ChatReplyResponse(BaseModel):
+    """The stored question and the assistant's answer"""
+    session_id: UUID
+    messages: list[ChatMessageResponse]
@@ -10,6 +10,7 @@ class FocusSessionStart(BaseModel):
     duration_minutes: int = Field(default=25, ge=1, le=180)
     break_duration_minutes: int = Field(default=5, ge=1, le=60)
     session_type: str = Field(default="focus")  # "focus" | "break" | "long_break"
+    task_id: UUID | None = None  # an open task of the user's, credited a pomodoro on completion
 
 
 class FocusSessionResponse(BaseModel):
@@ -21,9 +22,11 @@ class FocusSessionResponse(BaseModel):
     session_type: str
     started_at: datetime | None
     ended_at: datetime | None
+    actual_duration: int | None = None
     is_completed: bool
+    task_id: UUID | None = None
     created_at: datetime
-    updated_at: datetime
+    updated_at: datetime | None
 
     model_config = {"from_attributes": True}
 
@@ -36,7 +39,7 @@ class DistractionCreate(BaseModel):
     source_app: str | None = None
     destination_app: str | None = None
     url: str | None = None
-    duration_seconds: int | None = None
+    duration_seconds: int | None = Field(default=None, ge=0, le=2**31 - 1)  # fits the INTEGER column
 
 
 class DistractionResponse(BaseModel):
@@ -50,6 +53,18 @@ class DistractionResponse(BaseModel):
     duration_seconds: int | None
     occured_at: datetime
     created_at: datetime
-    updated_at: datetime
+    updated_at: datetime | None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class DistractionBatchCreate(BaseModel):
+    """Request to log a burst of distractions against the active session"""
+    items: list[DistractionCreate] = Field(min_length=1, max_length=500)
+
+
+class DistractionBatchResponse(BaseModel):
+    """Per-item results of a batch, in request order"""
+    focus_session_id: UUID
+    inserted: int
+    items: list[DistractionResponse]
\ No newline at end of file
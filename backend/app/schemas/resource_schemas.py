@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+
+
+# ============ RESOURCE SCHEMAS ============
+
+class ResourceResponse(BaseModel):
+    """Response for a resource in the user's library"""
+    id: UUID
+    user_id: UUID
+    title: str
+    url: str | None
+    resource_type: str
+    notes: str | None
+    is_favorite: bool
+    created_at: datetime
+    updated_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+
+class ResourceSearchResult(ResourceResponse):
+    """A search hit; `score` combines full-text rank and title similarity"""
+    score: float
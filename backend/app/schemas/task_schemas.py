@@ -0,0 +1,114 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime
+from uuid import UUID
+
+
+def _reject_nulls(model: BaseModel, *fields: str) -> BaseModel:
+    """Partial updates may omit these fields but not set them to null."""
+    for field in fields:
+        if field in model.model_fields_set and getattr(model, field) is None:
+            raise ValueError(f"{field} cannot be null")
+    return model
+
+
+# ============ SUBTASK SCHEMAS ============
+
+class SubtaskCreate(BaseModel):
+    """Request to add a subtask; new subtasks go to the end of the list"""
+    title: str = Field(min_length=1, max_length=255)
+
+
+class SubtaskUpdate(BaseModel):
+    """Partial update of a subtask"""
+    title: str | None = Field(default=None, min_length=1, max_length=255)
+    is_completed: bool | None = None
+
+    @model_validator(mode="after")
+    def no_null_required_fields(self):
+        return _reject_nulls(self, "title", "is_completed")
+
+
+class SubtaskMove(BaseModel):
+    """
+    Drop a subtask between two siblings: `after_id` is the subtask it should
+    follow and `before_id` the one it should precede. Omit `after_id` to move
+    to the top and `before_id` to move to the bottom.
+    """
+    after_id: UUID | None = None
+    before_id: UUID | None = None
+
+    @model_validator(mode="after")
+    def distinct_neighbours(self):
+        if self.after_id is not None and self.after_id == self.before_id:
+            raise ValueError("after_id and before_id must differ")
+        return self
+
+
+class SubtaskResponse(BaseModel):
+    """Response for subtask data"""
+    id: UUID
+    task_id: UUID
+    title: str
+    is_completed: bool
+    rank: str
+    created_at: datetime
+    updated_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+
+# ============ TASK SCHEMAS ============
+
+class TaskCreate(BaseModel):
+    """Request to create a task, optionally with its subtasks in order"""
+    title: str = Field(min_length=1, max_length=255)
+    description: str | None = None
+    priority: int = Field(default=1, ge=1, le=5)
+    due_date: datetime | None = None
+    estimated_pomodoros: int | None = Field(default=None, ge=1)
+    subtasks: list[SubtaskCreate] = Field(default_factory=list, max_length=200)
+
+
+class TaskUpdate(BaseModel):
+    """Partial update of a task"""
+    title: str | None = Field(default=None, min_length=1, max_length=255)
+    description: str | None = None
+    priority: int | None = Field(default=None, ge=1, le=5)
+    due_date: datetime | None = None
+    is_completed: bool | None = None
+    estimated_pomodoros: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def no_null_required_fields(self):
+        return _reject_nulls(self, "title", "priority", "is_completed")
+
+
+class TaskResponse(BaseModel):
+    """Response for a task with its subtasks in rank order"""
+    id: UUID
+    user_id: UUID
+    title: str
+    description: str | None
+    priority: int
+    due_date: datetime | None
+    is_completed: bool
+    estimated_pomodoros: int | None
+    completed_pomodoros: int
+    created_at: datetime
+    updated_at: datetime | None
+    subtasks: list[SubtaskResponse]
+
+    model_config = {"from_attributes": True}
+
+
+class NextTaskResponse(BaseModel):
+    """An open task suggested for the next pomodoro"""
+    id: UUID
+    title: str
+    priority: int
+    due_date: datetime | None
+    estimated_pomodoros: int | None
+    completed_pomodoros: int
+    remaining_pomodoros: int | None  # negative once the estimate is exceeded
+
+    model_config = {"from_attributes": True}
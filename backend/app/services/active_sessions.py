@@ -0,0 +1,56 @@
+from typing import Protocol
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.focus_session_schemas import FocusSessionResponse
+from app.services.session_events import SessionEvent, session_events
+from app.utils.ttl_cache import TTLCache
+
+
+class ActiveSessionStore(Protocol):
+    """
+    Write-through cache of each user's open focus session.
+
+    The database (and its partial unique index) stays authoritative; a store
+    only saves the lookup. It holds open sessions only: "no open session" is
+    never cached, so a session started elsewhere is seen at once, and no
+    write is rejected on the strength of a cached entry.
+    """
+
+    async def get(self, user_id: UUID) -> FocusSessionResponse | None: ...
+
+    async def set(self, user_id: UUID, session: FocusSessionResponse) -> None: ...
+
+    async def invalidate(self, user_id: UUID) -> None: ...
+
+
+class InMemoryActiveSessionStore:
+    """
+    Per-process store. Entries changed by another worker are dropped when
+    its `session.*` event arrives through the session event broker, which
+    therefore must be `postgres` when running several workers. The TTL
+    bounds staleness if an event is lost.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries: TTLCache[UUID, FocusSessionResponse] = TTLCache(max_size, ttl_seconds)
+
+    async def get(self, user_id: UUID) -> FocusSessionResponse | None:
+        return self._entries.get(user_id)
+
+    async def set(self, user_id: UUID, session: FocusSessionResponse) -> None:
+        self._entries.set(user_id, session)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        self._entries.pop(user_id)
+
+    def on_session_event(self, event: SessionEvent) -> None:
+        if event.remote and event.type.startswith("session."):
+            self._entries.pop(event.user_id)
+
+
+active_session_store = InMemoryActiveSessionStore(
+    max_size=settings.ACTIVE_SESSION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ACTIVE_SESSION_CACHE_TTL_SECONDS,
+)
+session_events.add_listener(active_session_store.on_session_event)
@@ -0,0 +1,251 @@
+"""
+Dashboard aggregates.
+
+Focus totals come straight from the `study_sessions` daily rollup. Distraction
+breakdowns and best-hours come from `daily_distraction_stats` and
+`hourly_focus_stats`, which cover closed days up to a watermark and are
+refreshed incrementally; days after the watermark (normally just today) are
+aggregated from raw rows at query time.
+
+    python -m app.services.analytics refresh [--full]
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Literal
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, extract, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.analytics_model import AnalyticsWatermark, DailyDistractionStat, HourlyFocusStat
+from app.models.distractions_model import Distraction
+from app.models.focus_model import FocusSession
+from app.models.session_model import StudySession
+from app.services.rollups import activity_date
+
+WATERMARK = "analytics"
+# Closed days are re-aggregated this far back on every refresh to pick up
+# late writes (buffered or spilled distractions, sessions completed later).
+LOOKBACK_DAYS = 2
+
+Granularity = Literal["day", "week", "month"]
+DistractionGroup = Literal["distraction_type", "source_app"]
+
+
+def today() -> date:
+    return activity_date(datetime.now(timezone.utc))
+
+
+def local_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=ZoneInfo(settings.ACTIVITY_TIMEZONE))
+
+
+async def get_watermark(db: AsyncSession) -> date | None:
+    watermark = await db.get(AnalyticsWatermark, WATERMARK)
+    return watermark.refreshed_through if watermark else None
+
+
+def _split_range(start: date, end: date, watermark: date | None) -> tuple[tuple[date, date] | None, tuple[date, date] | None]:
+    """Split [start, end] into the part served by rollups and the part aggregated live."""
+    if watermark is None or watermark < start:
+        return None, (start, end)
+    if watermark >= end:
+        return (start, end), None
+    return (start, watermark), (watermark + timedelta(days=1), end)
+
+
+# ============ QUERIES ============
+
+async def focus_series(
+    db: AsyncSession, user_id: UUID, start: date, end: date, granularity: Granularity
+) -> list[dict]:
+    period = cast(func.date_trunc(granularity, StudySession.session_date), Date).label("period_start")
+    result = await db.execute(
+        select(
+            period,
+            func.sum(StudySession.total_focus_minutes).label("focus_minutes"),
+            func.sum(StudySession.total_break_minutes).label("break_minutes"),
+            func.sum(StudySession.sessions_completed).label("sessions_completed"),
+            func.sum(StudySession.distraction_count).label("distraction_count"),
+        )
+        .where(
+            StudySession.user_id == user_id,
+            StudySession.session_date >= start,
+            StudySession.session_date <= end,
+        )
+        .group_by(period)
+        .order_by(period)
+    )
+    return [row._asdict() for row in result]
+
+
+async def distraction_breakdown(
+    db: AsyncSession, user_id: UUID, start: date, end: date, group_by: DistractionGroup
+) -> list[dict]:
+    rolled, live = _split_range(start, end, await get_watermark(db))
+    counts: dict[str | None, int] = {}
+
+    if rolled:
+        key = getattr(DailyDistractionStat, group_by)
+        result = await db.execute(
+            select(key, func.sum(DailyDistractionStat.count))
+            .where(
+                DailyDistractionStat.user_id == user_id,
+                DailyDistractionStat.day >= rolled[0],
+                DailyDistractionStat.day <= rolled[1],
+            )
+            .group_by(key)
+        )
+        for value, count in result:
+            value = value or None  # "" is the rollup's stand-in for NULL source_app
+            counts[value] = counts.get(value, 0) + count
+
+    if live:
+        key = getattr(Distraction, group_by)
+        result = await db.execute(
+            select(key, func.count())
+            .join(FocusSession, FocusSession.id == Distraction.focus_session_id)
+            .where(
+                FocusSession.user_id == user_id,
+                Distraction.occured_at >= local_midnight(live[0]),
+                Distraction.occured_at < local_midnight(live[1] + timedelta(days=1)),
+            )
+            .group_by(key)
+        )
+        for value, count in result:
+            counts[value] = counts.get(value, 0) + count
+
+    return [
+        {"key": key, "count": count}
+        for key, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+async def best_hours(db: AsyncSession, user_id: UUID, start: date, end: date) -> list[dict]:
+    rolled, live = _split_range(start, end, await get_watermark(db))
+    hours: dict[int, list[int]] = {}
+
+    if rolled:
+        result = await db.execute(
+            select(
+                HourlyFocusStat.hour,
+                func.sum(HourlyFocusStat.focus_minutes),
+                func.sum(HourlyFocusStat.sessions_completed),
+            )
+            .where(
+                HourlyFocusStat.user_id == user_id,
+                HourlyFocusStat.day >= rolled[0],
+                HourlyFocusStat.day <= rolled[1],
+            )
+            .group_by(HourlyFocusStat.hour)
+        )
+        for hour, minutes, sessions in result:
+            totals = hours.setdefault(int(hour), [0, 0])
+            totals[0] += minutes
+            totals[1] += sessions
+
+    if live:
+        hour = extract("hour", func.timezone(settings.ACTIVITY_TIMEZONE, FocusSession.started_at))
+        result = await db.execute(
+            select(
+                hour,
+                func.sum(func.coalesce(FocusSession.actual_duration, FocusSession.duration_minutes)),
+                func.count(),
+            )
+            .where(
+                FocusSession.user_id == user_id,
+                FocusSession.is_completed == True,
+                FocusSession.session_type == "focus",
+                FocusSession.started_at >= local_midnight(live[0]),
+                FocusSession.started_at < local_midnight(live[1] + timedelta(days=1)),
+            )
+            .group_by(hour)
+        )
+        for hour_value, minutes, sessions in result:
+            totals = hours.setdefault(int(hour_value), [0, 0])
+            totals[0] += minutes
+            totals[1] += sessions
+
+    return [
+        {"hour": hour, "focus_minutes": minutes, "sessions_completed": sessions}
+        for hour, (minutes, sessions) in sorted(hours.items(), key=lambda item: item[1][0], reverse=True)
+    ]
+
+
+# ============ REFRESH ============
+
+_REFRESH_DISTRACTIONS_SQL = text("""
+INSERT INTO daily_distraction_stats (id, user_id, day, distraction_type, source_app, count, created_at)
+SELECT gen_random_uuid(), fs.user_id, (d.occured_at AT TIME ZONE :tz)::date,
+       d.distraction_type, coalesce(d.source_app, ''), count(*), now()
+FROM distractions d
+JOIN focus_sessions fs ON fs.id = d.focus_session_id
+WHERE (CAST(:start AS date) IS NULL OR d.occured_at >= (CAST(:start AS date)::timestamp AT TIME ZONE :tz))
+  AND d.occured_at < ((CAST(:through AS date) + 1)::timestamp AT TIME ZONE :tz)
+GROUP BY 2, 3, 4, 5
+ON CONFLICT (user_id, day, distraction_type, source_app) DO UPDATE SET
+    count = EXCLUDED.count,
+    updated_at = now()
+""")
+
+_REFRESH_HOURLY_SQL = text("""
+INSERT INTO hourly_focus_stats (id, user_id, day, hour, focus_minutes, sessions_completed, created_at)
+SELECT gen_random_uuid(), user_id, (started_at AT TIME ZONE :tz)::date,
+       extract(hour FROM started_at AT TIME ZONE :tz)::smallint,
+       sum(coalesce(actual_duration, duration_minutes)), count(*), now()
+FROM focus_sessions
+WHERE is_completed AND session_type = 'focus' AND started_at IS NOT NULL
+  AND (CAST(:start AS date) IS NULL OR started_at >= (CAST(:start AS date)::timestamp AT TIME ZONE :tz))
+  AND started_at < ((CAST(:through AS date) + 1)::timestamp AT TIME ZONE :tz)
+GROUP BY 2, 3, 4
+ON CONFLICT (user_id, day, hour) DO UPDATE SET
+    focus_minutes = EXCLUDED.focus_minutes,
+    sessions_completed = EXCLUDED.sessions_completed,
+    updated_at = now()
+""")
+
+
+async def refresh_analytics(db: AsyncSession, full: bool = False) -> date:
+    """
+    Bring the rollup tables up to yesterday and advance the watermark.
+
+    Only days since the previous watermark (minus LOOKBACK_DAYS) are
+    re-aggregated unless `full` is set. The caller owns the commit.
+    """
+    through = today() - timedelta(days=1)
+    watermark = None if full else await get_watermark(db)
+    start = watermark - timedelta(days=LOOKBACK_DAYS) if watermark else None
+
+    params = {"tz": settings.ACTIVITY_TIMEZONE, "start": start, "through": through}
+    await db.execute(_REFRESH_DISTRACTIONS_SQL, params)
+    await db.execute(_REFRESH_HOURLY_SQL, params)
+
+    stmt = insert(AnalyticsWatermark).values(name=WATERMARK, refreshed_through=through)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"refreshed_through": stmt.excluded.refreshed_through}
+    ))
+    return through
+
+
+async def _main() -> None:
+    from app.db.neondb import AsyncSessionLocal, dispose_db, init_db
+
+    parser = argparse.ArgumentParser(description="Analytics rollup maintenance")
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("--full", action="store_true", help="re-aggregate all history, not just recent days")
+    args = parser.parse_args()
+
+    init_db()
+    async with AsyncSessionLocal() as db:
+        through = await refresh_analytics(db, full=args.full)
+        await db.commit()
+    await dispose_db()
+    print(f"Analytics refreshed through {through}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
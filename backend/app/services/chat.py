@@ -0,0 +1,380 @@
+"""
+Conversation context for the AI study assistant.
+
+Building a prompt never reads a whole chat. Each conversation keeps a rolling
+summary of its older messages in `chat_summaries`, fronted by a
+per-process cache. Only messages newer than that summary are fetched, with
+one keyset query on `ix_chat_messages_conversation` that is capped at
+`CHAT_CONTEXT_MESSAGES + CHAT_SUMMARY_BATCH` rows. When the cap is reached,
+the oldest `CHAT_SUMMARY_BATCH` messages are folded into the summary by the
+model, and again until the rest fits under the cap. The context a model sees is therefore bounded by one summary plus
+fewer than `CHAT_CONTEXT_MESSAGES + CHAT_SUMMARY_BATCH` messages.
+
+Every model call goes through the limiter in `app.services.model_calls`.
+An answer whose full input was seen before comes from its response cache
+instead of a call.
+
+pydantic-ai is imported on first use so that app startup does not pay for
+it. Setting `CHAT_MODEL=test` runs everything against its local stub model.
+"""
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import untracked
+from app.models.chatmessage_model import ChatMessage, ChatSummary
+from app.schemas.chat_schemas import ChatMessageResponse
+from app.services.model_calls import model_calls, prompt_key, response_cache
+from app.services.session_events import format_sse
+from app.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from pydantic_ai.messages import ModelMessage
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_INSTRUCTIONS = (
+    "You are a concise study assistant inside a Pomodoro focus app. Help the "
+    "user plan, understand and review what they are studying."
+)
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a student and "
+    "a study assistant. Given the current summary and newer messages, reply "
+    "with an updated summary only. Keep facts, goals and open questions; "
+    "drop small talk."
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ConversationSummary:
+    """Summary text and the (sent_at, id) of the newest message folded into it; `through` is None before the first fold."""
+    text: str
+    through: tuple[datetime, UUID] | None = None
+
+
+EMPTY_SUMMARY = ConversationSummary("")
+
+
+@dataclass(frozen=True, slots=True)
+class ConversationContext:
+    summary: ConversationSummary
+    messages: list  # rows with role, content, sent_at and id, oldest first
+
+
+# ============ SUMMARY CACHE ============
+
+# In front of `chat_summaries`. A stale entry only means an older summary
+# and a larger tail to fetch.
+summary_cache: TTLCache[tuple[UUID, UUID], ConversationSummary] = TTLCache(
+    max_size=settings.CHAT_SUMMARY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CHAT_SUMMARY_CACHE_TTL_SECONDS,
+)
+
+
+# ============ MODEL ============
+
+@cache
+def chat_agent() -> "Agent[None, str]":
+    from pydantic_ai import Agent
+    return Agent(settings.CHAT_MODEL, instructions=ASSISTANT_INSTRUCTIONS, defer_model_check=True)
+
+
+@cache
+def summary_agent() -> "Agent[None, str]":
+    from pydantic_ai import Agent
+    return Agent(settings.CHAT_MODEL, instructions=SUMMARY_INSTRUCTIONS, defer_model_check=True)
+
+
+def to_model_messages(context: ConversationContext) -> list["ModelMessage"]:
+    """pydantic-ai message history for `context`, each message clipped to CHAT_CONTEXT_MESSAGE_MAX_CHARS."""
+    from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+
+    limit = settings.CHAT_CONTEXT_MESSAGE_MAX_CHARS
+    history: list[ModelMessage] = []
+    if context.summary.text:
+        history.append(ModelRequest(parts=[
+            SystemPromptPart(content=f"Summary of the earlier conversation:\n{context.summary.text}")
+        ]))
+    for message in context.messages:
+        if message.role == "assistant":
+            history.append(ModelResponse(parts=[TextPart(content=message.content[:limit])]))
+        else:
+            history.append(ModelRequest(parts=[UserPromptPart(content=message.content[:limit])]))
+    return history
+
+
+def answered(messages: list) -> list:
+    """`messages` without assistant rows left empty by a stream that failed or was dropped before its first save."""
+    return [message for message in messages if message.role != "assistant" or message.content]
+
+
+async def fold(summary: ConversationSummary, messages: list) -> ConversationSummary:
+    """Summarize `messages` (oldest first) into `summary` with one model call."""
+    limit = settings.CHAT_CONTEXT_MESSAGE_MAX_CHARS
+    transcript = "\n".join(f"{message.role}: {message.content[:limit]}" for message in answered(messages))
+    result = await summary_agent().run(
+        f"Current summary:\n{summary.text or '(none)'}\n\nNewer messages:\n{transcript}"
+    )
+    last = messages[-1]
+    return ConversationSummary(result.output[:settings.CHAT_SUMMARY_MAX_CHARS], (last.sent_at, last.id))
+
+
+# ============ STORAGE ============
+
+async def load_summary(db: AsyncSession, user_id: UUID, session_id: UUID) -> ConversationSummary:
+    cached = summary_cache.get((user_id, session_id))
+    if cached is not None:
+        return cached
+    result = await db.execute(
+        select(ChatSummary.summary, ChatSummary.through_sent_at, ChatSummary.through_message_id)
+        .where(ChatSummary.user_id == user_id, ChatSummary.session_id == session_id)
+    )
+    row = result.one_or_none()
+    summary = (
+        ConversationSummary(row.summary, (row.through_sent_at, row.through_message_id)) if row else EMPTY_SUMMARY
+    )
+    summary_cache.set((user_id, session_id), summary)
+    return summary
+
+
+async def save_summary(db: AsyncSession, user_id: UUID, session_id: UUID, summary: ConversationSummary) -> None:
+    """Upsert `summary`; a concurrent fold that already got further wins. The caller owns the commit."""
+    through_sent_at, through_message_id = summary.through
+    statement = pg_insert(ChatSummary).values(
+        user_id=user_id,
+        session_id=session_id,
+        summary=summary.text,
+        through_sent_at=through_sent_at,
+        through_message_id=through_message_id,
+    )
+    excluded = statement.excluded
+    await db.execute(
+        statement.on_conflict_do_update(
+            constraint="uq_chat_summaries_conversation",
+            set_={
+                "summary": excluded.summary,
+                "through_sent_at": excluded.through_sent_at,
+                "through_message_id": excluded.through_message_id,
+                "updated_at": func.now(),
+            },
+            where=tuple_(ChatSummary.through_sent_at, ChatSummary.through_message_id)
+            < tuple_(excluded.through_sent_at, excluded.through_message_id),
+        )
+    )
+
+
+def conversation_window(user_id: UUID, session_id: UUID, limit: int, before: tuple[datetime, UUID] | None = None):
+    """Newest-first keyset window of one conversation, optionally strictly older than `before`."""
+    query = (
+        select(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.sent_at, ChatMessage.session_id)
+        .where(ChatMessage.user_id == user_id, ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.sent_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        query = query.where(tuple_(ChatMessage.sent_at, ChatMessage.id) < before)
+    return query
+
+
+async def unsummarized_messages(
+    db: AsyncSession, user_id: UUID, session_id: UUID, summary: ConversationSummary, limit: int
+) -> list:
+    """The oldest `limit` messages not yet folded into `summary`, oldest first. Ends `db`'s transaction."""
+    query = (
+        select(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.sent_at, ChatMessage.session_id)
+        .where(ChatMessage.user_id == user_id, ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.sent_at, ChatMessage.id)
+        .limit(limit)
+    )
+    if summary.through is not None:
+        query = query.where(tuple_(ChatMessage.sent_at, ChatMessage.id) > summary.through)
+    result = await db.execute(query)
+    rows = result.all()
+    await db.commit()
+    return rows
+
+
+async def build_context(db: AsyncSession, user_id: UUID, session_id: UUID) -> ConversationContext:
+    """
+    Summary plus the messages after it. While the unsummarized tail is full,
+    its oldest batch is folded into the summary (and committed), so every
+    message ends up either in the summary or in the tail.
+
+    `db`'s transaction is ended before each fold's model call and before
+    returning, so its pooled connection is never held while a model answers.
+    """
+    summary = await load_summary(db, user_id, session_id)
+    window, batch = settings.CHAT_CONTEXT_MESSAGES, settings.CHAT_SUMMARY_BATCH
+
+    # One row past a full tail shows whether more messages follow it.
+    tail = await unsummarized_messages(db, user_id, session_id, summary, window + batch + 1)
+    charged = True
+    while len(tail) >= window + batch:
+        folded, tail = tail[:batch], tail[batch:]
+        async with model_calls.slot(user_id):
+            summary = await fold(summary, folded)
+        # Only the first fold is charged to the request. Further ones catch
+        # up on a backlog (turns written concurrently, or history older than
+        # its summary) whose size the request does not control.
+        with nullcontext() if charged else untracked():
+            await save_summary(db, user_id, session_id, summary)
+            await db.commit()
+        summary_cache.set((user_id, session_id), summary)
+        charged = False
+        if len(tail) > window:
+            with untracked():
+                tail = await unsummarized_messages(db, user_id, session_id, summary, window + batch + 1)
+    return ConversationContext(summary, answered(tail))
+
+
+async def insert_messages(
+    db: AsyncSession, user_id: UUID, session_id: UUID, messages: list[tuple[str, str, datetime]]
+) -> list[ChatMessage]:
+    """INSERT (role, content, sent_at) rows in one statement, returning them in order. The caller owns the commit."""
+    result = await db.scalars(
+        insert(ChatMessage).returning(ChatMessage, sort_by_parameter_order=True),
+        [
+            ChatMessage(user_id=user_id, session_id=session_id, role=role, content=content, sent_at=sent_at).model_dump()
+            for role, content, sent_at in messages
+        ],
+    )
+    return list(result.all())
+
+
+def response_key(context: ConversationContext, prompt: str) -> str:
+    """Content address of everything the assistant model sees for `prompt`."""
+    limit = settings.CHAT_CONTEXT_MESSAGE_MAX_CHARS
+    return prompt_key(
+        settings.CHAT_MODEL,
+        ASSISTANT_INSTRUCTIONS,
+        context.summary.text,
+        [(message.role, message.content[:limit]) for message in context.messages],
+        prompt,
+    )
+
+
+async def reply(db: AsyncSession, user_id: UUID, session_id: UUID, content: str) -> list[ChatMessage]:
+    """Answer `content` in the conversation and store both messages; returns [user message, assistant message]."""
+    asked_at = datetime.utcnow()
+    context = await build_context(db, user_id, session_id)
+    key = response_key(context, content)
+    answer = response_cache.get(key)
+    if answer is None:
+        async with model_calls.slot(user_id):
+            result = await chat_agent().run(content, message_history=to_model_messages(context))
+        answer = result.output
+        response_cache.set(key, answer)
+
+    # A new transaction: build_context released the connection for the model call.
+    messages = await insert_messages(db, user_id, session_id, [
+        ("user", content, asked_at),
+        ("assistant", answer, datetime.utcnow()),
+    ])
+    await db.commit()
+    return messages
+
+
+# ============ STREAMING ============
+
+async def save_answer(
+    session_factory: async_sessionmaker[AsyncSession], message_id: UUID, content: str
+) -> ChatMessage | None:
+    """Overwrite a streamed answer's content in its own short transaction."""
+    # Outside the request's query budget: a stream saves as often as it runs long.
+    with untracked():
+        async with session_factory() as db:
+            message = await db.scalar(
+                update(ChatMessage).where(ChatMessage.id == message_id).values(content=content).returning(ChatMessage)
+            )
+            await db.commit()
+    return message
+
+
+async def discard_answer(session_factory: async_sessionmaker[AsyncSession], message_id: UUID) -> None:
+    """Delete a streamed answer that never received any text."""
+    with untracked():
+        async with session_factory() as db:
+            await db.execute(delete(ChatMessage).where(ChatMessage.id == message_id))
+            await db.commit()
+
+
+def _message_json(message) -> str:
+    return ChatMessageResponse.model_validate(message).model_dump_json()
+
+
+async def stream_reply(
+    session_factory: async_sessionmaker[AsyncSession], user_id: UUID, session_id: UUID, content: str
+) -> AsyncIterator[str]:
+    """
+    Server-sent events answering `content`: `message` with the stored
+    question, then `delta` chunks of the answer, then `done` with the final
+    assistant message (or `error`).
+
+    Both rows are written before the first event. A streamed answer row
+    starts empty and is saved every CHAT_STREAM_PERSIST_SECONDS and at the
+    end, so a dropped connection keeps what was streamed up to the last
+    save; if the model fails before any text it is deleted, and one still
+    empty after a dropped connection is left out of later contexts. No
+    database connection is held while waiting for a model-call slot or
+    between saves. The slot is held until the generator finishes or is
+    closed.
+    """
+    asked_at = datetime.utcnow()
+    async with AsyncExitStack() as stack:
+        async with session_factory(info={"user_id": user_id}) as db:
+            context = await build_context(db, user_id, session_id)
+        key = response_key(context, content)
+        cached = response_cache.get(key)
+        if cached is None:
+            # Queued callers wait here for up to CHAT_CALL_QUEUE_SECONDS, with no session open.
+            await stack.enter_async_context(model_calls.slot(user_id))
+        async with session_factory(info={"user_id": user_id}) as db:
+            question, answer = await insert_messages(db, user_id, session_id, [
+                ("user", content, asked_at),
+                ("assistant", cached or "", datetime.utcnow()),
+            ])
+            await db.commit()
+        yield format_sse("message", _message_json(question))
+
+        if cached is not None:
+            yield format_sse("delta", json.dumps({"text": cached}))
+            yield format_sse("done", _message_json(answer))
+            return
+
+        parts: list[str] = []
+        saved_at = time.monotonic()
+        try:
+            async with chat_agent().run_stream(content, message_history=to_model_messages(context)) as result:
+                async for delta in result.stream_text(delta=True):
+                    parts.append(delta)
+                    yield format_sse("delta", json.dumps({"text": delta}))
+                    if time.monotonic() - saved_at >= settings.CHAT_STREAM_PERSIST_SECONDS:
+                        await save_answer(session_factory, answer.id, "".join(parts))
+                        saved_at = time.monotonic()
+        except Exception:
+            logger.exception("Assistant stream failed")
+            if parts:
+                await save_answer(session_factory, answer.id, "".join(parts))
+            else:
+                await discard_answer(session_factory, answer.id)
+            yield format_sse("error", json.dumps({"detail": "The assistant stopped answering"}))
+            return
+        text = "".join(parts)
+        if text:
+            response_cache.set(key, text)
+
+        answer = await save_answer(session_factory, answer.id, text)
+        yield format_sse("done", _message_json(answer))
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import untracked
+from app.db.neondb import AsyncSessionLocal
+from app.models.distractions_model import Distraction
+from app.schemas.focus_session_schemas import DistractionCreate
+from app.services.rollups import apply_rollup_deltas, distraction_delta
+
+logger = logging.getLogger(__name__)
+
+_UUID_FIELDS = ("id", "focus_session_id")
+_DATETIME_FIELDS = ("occured_at", "created_at", "updated_at")
+_FOREIGN_KEY_VIOLATION = "23503"
+
+
+@dataclass
+class _SessionBatch:
+    user_id: UUID
+    rows: list[dict] = field(default_factory=list)
+
+
+def _encode(user_id: UUID, row: dict) -> str:
+    return json.dumps(
+        {"user_id": str(user_id)}
+        | {k: (str(v) if k in _UUID_FIELDS else v.isoformat() if isinstance(v, datetime) else v)
+           for k, v in row.items()}
+    )
+
+
+def _decode(line: str) -> tuple[UUID, dict]:
+    row = json.loads(line)
+    user_id = UUID(row.pop("user_id"))
+    for key in _UUID_FIELDS:
+        row[key] = UUID(row[key])
+    for key in _DATETIME_FIELDS:
+        if row.get(key) is not None:
+            row[key] = datetime.fromisoformat(row[key])
+    return user_id, row
+
+
+def _is_outage(exc: DBAPIError) -> bool:
+    """Whether `exc` means the database could not be reached, as opposed to it rejecting the rows."""
+    if exc.connection_invalidated or isinstance(exc, OperationalError):
+        return True
+    # asyncpg reports a row it cannot encode (e.g. an integer out of range)
+    # as an InterfaceError that is also a ValueError; that is bad data.
+    return isinstance(exc, InterfaceError) and not isinstance(exc.orig.__cause__, ValueError)
+
+
+def _missing_session(exc: DBAPIError) -> bool:
+    return (
+        isinstance(exc, IntegrityError)
+        and getattr(exc.orig.__cause__, "sqlstate", None) == _FOREIGN_KEY_VIOLATION
+    )
+
+
+class DistractionBuffer:
+    """
+    Write-behind buffer for distraction events.
+
+    `add` assigns the row's id and timestamps and returns immediately; rows
+    are grouped per focus session and written in one multi-row INSERT once
+    `max_batch` rows are pending or every `flush_interval` seconds. Rows
+    taken off the buffer are never dropped: if the write fails for any
+    reason other than the database rejecting them (it is unreachable, the
+    flush was cancelled, ...), the batch is appended to `spill_path` and
+    replayed on a later flush. Inserts are idempotent on `id` and only rows
+    actually inserted count towards the daily rollups, so replaying a batch
+    that did reach the database is harmless.
+
+    When the database does reject a statement, the batch is retried per
+    session and then per row, so one bad row only costs itself: it goes to
+    `quarantine_path` for inspection. Rows of a session deleted meanwhile
+    (a cancel) are the only ones discarded.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch: int,
+        flush_interval: float,
+        spill_path: str,
+        quarantine_path: str,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path)
+        self.quarantine_path = Path(quarantine_path)
+        self._pending: dict[UUID, _SessionBatch] = {}
+        self._pending_count = 0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    def add(self, user_id: UUID, focus_session_id: UUID, item: DistractionCreate) -> dict:
+        """Buffer one distraction and return the row as it will be stored."""
+        row = {
+            "id": uuid4(),
+            "focus_session_id": focus_session_id,
+            "occured_at": datetime.now(timezone.utc),
+            "created_at": datetime.utcnow(),
+            "updated_at": None,
+            **item.model_dump(),
+        }
+        batch = self._pending.get(focus_session_id)
+        if batch is None:
+            batch = self._pending[focus_session_id] = _SessionBatch(user_id)
+        batch.rows.append(row)
+        self._pending_count += 1
+        if self._pending_count >= self.max_batch:
+            self._wakeup.set()
+        return row
+
+    def discard(self, focus_session_id: UUID) -> None:
+        """Drop buffered rows for a session that is about to be deleted."""
+        batch = self._pending.pop(focus_session_id, None)
+        if batch is not None:
+            self._pending_count -= len(batch.rows)
+
+    async def flush(self, focus_session_id: UUID | None = None) -> None:
+        """
+        Write pending rows (all of them, or one session's) to the database.
+
+        The statements are not charged to the calling request: how many a
+        flush issues depends on the buffer and the spill file, not on it.
+        """
+        with untracked():
+            await self._flush(focus_session_id)
+
+    async def _flush(self, focus_session_id: UUID | None) -> None:
+        async with self._flush_lock:
+            await self._replay_spill()
+
+            if focus_session_id is None:
+                batches, self._pending = self._pending, {}
+            else:
+                batch = self._pending.pop(focus_session_id, None)
+                batches = {focus_session_id: batch} if batch else {}
+            if not batches:
+                return
+            count = sum(len(batch.rows) for batch in batches.values())
+            self._pending_count -= count
+
+            try:
+                await self._write(batches)
+            except BaseException as exc:
+                if isinstance(exc, DBAPIError | OSError):
+                    logger.warning("Database unavailable, spilling %d distractions", count)
+                else:
+                    logger.exception("Distraction flush failed, spilling %d rows", count)
+                self._spill(batches)
+                if not isinstance(exc, Exception):
+                    raise
+
+    async def _write(self, batches: dict[UUID, _SessionBatch]) -> None:
+        """
+        Insert `batches` in one transaction, splitting it up when the database
+        rejects it. Raises only if the rows could not be written at all (an
+        outage or a non-database error); the caller then spills `batches`.
+        """
+        try:
+            async with self.session_factory() as db:
+                await self._insert(db, batches)
+                await db.commit()
+            return
+        except DBAPIError as exc:
+            if _is_outage(exc):
+                raise
+            error = exc
+
+        if len(batches) > 1:
+            # One bad session (e.g. cancelled meanwhile) must not poison the others.
+            for session_id, batch in batches.items():
+                await self._write({session_id: batch})
+            return
+
+        [(session_id, batch)] = batches.items()
+        if _missing_session(error):
+            logger.warning("Dropping %d distractions for missing session %s", len(batch.rows), session_id)
+        elif len(batch.rows) > 1:
+            for row in batch.rows:
+                await self._write({session_id: _SessionBatch(batch.user_id, [row])})
+        else:
+            logger.error("Quarantining distraction %s rejected by the database: %s", batch.rows[0]["id"], error)
+            self._append(self.quarantine_path, batches)
+
+    @staticmethod
+    async def _insert(db: AsyncSession, batches: dict[UUID, _SessionBatch]) -> None:
+        rows = [row for batch in batches.values() for row in batch.rows]
+        result = await db.execute(
+            insert(Distraction)
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(Distraction.focus_session_id, Distraction.occured_at),
+            rows,
+        )
+        await apply_rollup_deltas(db, [
+            distraction_delta(batches[session_id].user_id, occured_at)
+            for session_id, occured_at in result
+        ])
+
+    def _spill(self, batches: dict[UUID, _SessionBatch]) -> None:
+        self._append(self.spill_path, batches)
+
+    @staticmethod
+    def _append(path: Path, batches: dict[UUID, _SessionBatch]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            for batch in batches.values():
+                for row in batch.rows:
+                    f.write(_encode(batch.user_id, row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _replay_spill(self) -> None:
+        if not self.spill_path.exists():
+            return
+        with self.spill_path.open(encoding="utf-8") as f:
+            records = [_decode(line) for line in f if line.strip()]
+        if records:
+            batches: dict[UUID, _SessionBatch] = {}
+            for user_id, row in records:
+                batches.setdefault(row["focus_session_id"], _SessionBatch(user_id)).rows.append(row)
+            try:
+                await self._write(batches)
+            except Exception:
+                logger.warning("Database still unavailable, keeping %d spilled distractions", len(records), exc_info=True)
+                return
+            logger.info("Replayed %d spilled distractions", len(records))
+        self.spill_path.unlink(missing_ok=True)
+
+    # ============ LIFECYCLE ============
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="distraction-buffer")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and drain everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Unexpected error in distraction flush loop")
+
+
+distraction_buffer = DistractionBuffer(
+    session_factory=AsyncSessionLocal,
+    max_batch=settings.DISTRACTION_BUFFER_MAX_BATCH,
+    flush_interval=settings.DISTRACTION_BUFFER_FLUSH_SECONDS,
+    spill_path=settings.DISTRACTION_BUFFER_SPILL_PATH,
+    quarantine_path=settings.DISTRACTION_BUFFER_QUARANTINE_PATH,
+)
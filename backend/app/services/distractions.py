@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.distractions_model import Distraction
+from app.schemas.focus_session_schemas import DistractionCreate
+
+
+async def insert_distractions(
+    db: AsyncSession,
+    focus_session_id: UUID,
+    items: list[DistractionCreate],
+) -> list[Distraction]:
+    """
+    Insert distractions for one session in a single multi-row INSERT ... RETURNING.
+
+    Rows come back in the same order as `items`. The caller owns the commit.
+    """
+    occured_at = datetime.now(timezone.utc)
+    rows = [
+        {"focus_session_id": focus_session_id, "occured_at": occured_at, **item.model_dump()}
+        for item in items
+    ]
+    result = await db.scalars(
+        insert(Distraction).returning(Distraction, sort_by_parameter_order=True),
+        rows,
+    )
+    return list(result.all())
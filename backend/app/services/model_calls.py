@@ -0,0 +1,86 @@
+"""
+Guards around outbound calls to the assistant's model.
+
+`model_calls` caps how many calls run at once, both in total and per user,
+so a slow provider cannot tie up every worker. A caller waits up to
+CHAT_CALL_QUEUE_SECONDS for a free global slot and then gets AssistantBusy
+(a 503). A user who already has CHAT_MAX_CONCURRENT_CALLS_PER_USER calls in
+flight gets RateLimitExceeded (a 429) immediately.
+
+`response_cache` holds answers keyed by a digest of everything the model
+would see, so a repeated identical prompt is answered without a call.
+Canned study tips asked at the start of a conversation are the typical hit.
+"""
+import asyncio
+import hashlib
+import json
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceeded
+from app.utils.ttl_cache import TTLCache
+
+
+class AssistantBusy(Exception):
+    """Every model-call slot stayed taken for the whole queueing window."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Assistant busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ModelCallLimiter:
+    def __init__(self, max_concurrent: int, max_per_user: int, queue_seconds: float, retry_after: int):
+        self.max_per_user = max_per_user
+        self.queue_seconds = queue_seconds
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._per_user: dict[UUID, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, user_id: UUID) -> AsyncIterator[None]:
+        """Hold one global and one per-user slot for the duration of a model call."""
+        in_flight = self._per_user.get(user_id, 0)
+        if in_flight >= self.max_per_user:
+            raise RateLimitExceeded(self.retry_after)
+        self._per_user[user_id] = in_flight + 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_seconds)
+            except TimeoutError:
+                raise AssistantBusy(self.retry_after) from None
+            try:
+                yield
+            finally:
+                self._slots.release()
+        finally:
+            remaining = self._per_user[user_id] - 1
+            if remaining:
+                self._per_user[user_id] = remaining
+            else:
+                del self._per_user[user_id]
+
+
+model_calls = ModelCallLimiter(
+    max_concurrent=settings.CHAT_MAX_CONCURRENT_CALLS,
+    max_per_user=settings.CHAT_MAX_CONCURRENT_CALLS_PER_USER,
+    queue_seconds=settings.CHAT_CALL_QUEUE_SECONDS,
+    retry_after=settings.CHAT_BUSY_RETRY_AFTER_SECONDS,
+)
+
+
+# ============ RESPONSE CACHE ============
+
+def prompt_key(*parts: str | Sequence) -> str:
+    """Content address of a model input: a digest of its JSON-encoded parts."""
+    encoded = json.dumps(parts, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+# Cached model answers by `prompt_key`; a max_size of 0 disables it.
+response_cache: TTLCache[str, str] = TTLCache(
+    max_size=settings.CHAT_RESPONSE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CHAT_RESPONSE_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,202 @@
+"""
+Incremental per-day rollups in `study_sessions`.
+
+Writes that change a user's daily totals add a `RollupDelta` inside their
+own transaction; `apply_rollup_deltas` folds them in with a single
+INSERT ... ON CONFLICT (user_id, session_date) DO UPDATE, so dashboard
+reads are one-row lookups. `rebuild_rollups` recomputes the table from raw
+focus sessions and distractions for backfills or repairs:
+
+    python -m app.services.rollups --since 2025-01-01
+"""
+import argparse
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Numeric, cast, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.session_model import StudySession
+
+# Each distraction costs this many minutes of "effective" focus in the score.
+DISTRACTION_PENALTY_MINUTES = 5
+
+
+@dataclass
+class RollupDelta:
+    user_id: UUID
+    session_date: date
+    focus_minutes: int = 0
+    break_minutes: int = 0
+    sessions_completed: int = 0
+    distraction_count: int = 0
+
+
+def activity_date(ts: datetime) -> date:
+    """Calendar day of `ts` in the configured activity timezone."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(ZoneInfo(settings.ACTIVITY_TIMEZONE)).date()
+
+
+def productivity_score(focus_minutes, distraction_count):
+    """0-100 score; works on ints or SQL expressions. None/NULL when there is no activity."""
+    if isinstance(focus_minutes, int) and isinstance(distraction_count, int):
+        weighted = focus_minutes + DISTRACTION_PENALTY_MINUTES * distraction_count
+        return round(100.0 * focus_minutes / weighted, 1) if weighted else None
+    weighted = focus_minutes + DISTRACTION_PENALTY_MINUTES * distraction_count
+    # round(double precision, int) does not exist in Postgres, hence the numeric cast.
+    return func.round(cast(100.0 * focus_minutes / func.nullif(weighted, 0), Numeric), 1)
+
+
+def session_completion_delta(session) -> RollupDelta:
+    """Delta for a FocusSession that just became completed."""
+    minutes = session.actual_duration if session.actual_duration is not None else session.duration_minutes
+    is_focus = session.session_type == "focus"
+    return RollupDelta(
+        user_id=session.user_id,
+        session_date=activity_date(session.ended_at),
+        focus_minutes=minutes if is_focus else 0,
+        break_minutes=0 if is_focus else minutes,
+        sessions_completed=1 if is_focus else 0,
+    )
+
+
+def distraction_delta(user_id: UUID, occured_at: datetime, count: int = 1) -> RollupDelta:
+    """Delta for a logged distraction; a `count` of -1 takes back one that was deleted."""
+    return RollupDelta(user_id=user_id, session_date=activity_date(occured_at), distraction_count=count)
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: Iterable[RollupDelta]) -> None:
+    """Atomically add deltas to the matching daily rows. The caller owns the commit."""
+    merged: dict[tuple[UUID, date], RollupDelta] = {}
+    for delta in deltas:
+        key = (delta.user_id, delta.session_date)
+        if key not in merged:
+            merged[key] = RollupDelta(delta.user_id, delta.session_date)
+        row = merged[key]
+        row.focus_minutes += delta.focus_minutes
+        row.break_minutes += delta.break_minutes
+        row.sessions_completed += delta.sessions_completed
+        row.distraction_count += delta.distraction_count
+    if not merged:
+        return
+
+    stmt = insert(StudySession).values([
+        {
+            "user_id": d.user_id,
+            "session_date": d.session_date,
+            "total_focus_minutes": d.focus_minutes,
+            "total_break_minutes": d.break_minutes,
+            "sessions_completed": d.sessions_completed,
+            "distraction_count": d.distraction_count,
+            "productivity_score": productivity_score(d.focus_minutes, d.distraction_count),
+        }
+        for d in merged.values()
+    ])
+    table = StudySession.__table__.c
+    focus = table.total_focus_minutes + stmt.excluded.total_focus_minutes
+    distractions = table.distraction_count + stmt.excluded.distraction_count
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "session_date"],
+        set_={
+            "total_focus_minutes": focus,
+            "total_break_minutes": table.total_break_minutes + stmt.excluded.total_break_minutes,
+            "sessions_completed": table.sessions_completed + stmt.excluded.sessions_completed,
+            "distraction_count": distractions,
+            "productivity_score": productivity_score(focus, distractions),
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+_REBUILD_SQL = text(f"""
+WITH sessions AS (
+    SELECT user_id,
+           (ended_at AT TIME ZONE :tz)::date AS day,
+           sum(coalesce(actual_duration, duration_minutes)) FILTER (WHERE session_type = 'focus') AS focus,
+           sum(coalesce(actual_duration, duration_minutes)) FILTER (WHERE session_type <> 'focus') AS brk,
+           count(*) FILTER (WHERE session_type = 'focus') AS completed
+    FROM focus_sessions
+    WHERE is_completed AND ended_at IS NOT NULL
+      AND (CAST(:since AS date) IS NULL OR (ended_at AT TIME ZONE :tz)::date >= :since)
+    GROUP BY 1, 2
+),
+distraction_days AS (
+    SELECT fs.user_id,
+           (d.occured_at AT TIME ZONE :tz)::date AS day,
+           count(*) AS n
+    FROM distractions d
+    JOIN focus_sessions fs ON fs.id = d.focus_session_id
+    WHERE CAST(:since AS date) IS NULL OR (d.occured_at AT TIME ZONE :tz)::date >= :since
+    GROUP BY 1, 2
+),
+combined AS (
+    SELECT coalesce(s.user_id, d.user_id) AS user_id,
+           coalesce(s.day, d.day) AS day,
+           coalesce(s.focus, 0) AS focus,
+           coalesce(s.brk, 0) AS brk,
+           coalesce(s.completed, 0) AS completed,
+           coalesce(d.n, 0) AS n
+    FROM sessions s
+    FULL JOIN distraction_days d ON d.user_id = s.user_id AND d.day = s.day
+),
+-- Days in range with no raw data left (everything on them was cancelled, or
+-- they belong to a former ACTIVITY_TIMEZONE) must not keep stale totals.
+stale AS (
+    DELETE FROM study_sessions ss
+    WHERE (CAST(:since AS date) IS NULL OR ss.session_date >= :since)
+      AND NOT EXISTS (SELECT 1 FROM combined c WHERE c.user_id = ss.user_id AND c.day = ss.session_date)
+)
+INSERT INTO study_sessions (
+    id, user_id, session_date, total_focus_minutes, total_break_minutes,
+    sessions_completed, distraction_count, productivity_score, created_at
+)
+SELECT gen_random_uuid(), user_id, day, focus, brk, completed, n,
+       round(100.0 * focus / nullif(focus + {DISTRACTION_PENALTY_MINUTES} * n, 0), 1),
+       now()
+FROM combined
+ON CONFLICT (user_id, session_date) DO UPDATE SET
+    total_focus_minutes = EXCLUDED.total_focus_minutes,
+    total_break_minutes = EXCLUDED.total_break_minutes,
+    sessions_completed = EXCLUDED.sessions_completed,
+    distraction_count = EXCLUDED.distraction_count,
+    productivity_score = EXCLUDED.productivity_score,
+    updated_at = now()
+""")
+
+
+async def rebuild_rollups(db: AsyncSession, since: date | None = None) -> int:
+    """
+    Recompute daily rows from raw data in one set-based statement, deleting
+    rows in range whose day no longer has any. Returns rows written.
+    """
+    result = await db.execute(_REBUILD_SQL, {"tz": settings.ACTIVITY_TIMEZONE, "since": since})
+    return result.rowcount
+
+
+async def _main() -> None:
+    from app.db.neondb import AsyncSessionLocal, dispose_db, init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild study_sessions daily rollups")
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="only rebuild days on or after this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    init_db()
+    async with AsyncSessionLocal() as db:
+        written = await rebuild_rollups(db, args.since)
+        await db.commit()
+    await dispose_db()
+    print(f"Rebuilt {written} daily rollups")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import secrets
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Final
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import SessionEventBrokerKind, settings
+from app.db.neondb import init_db
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+_MAX_NOTIFY_PAYLOAD = 7_900
+
+
+@dataclass(frozen=True, slots=True)
+class SessionEvent:
+    """
+    A change to one user's focus session; `data` is already-serialized JSON.
+    `remote` marks events published by another worker.
+    """
+    user_id: UUID
+    type: str
+    data: str
+    remote: bool = False
+
+
+class _Overflow:
+    def __repr__(self) -> str:
+        return "OVERFLOW"
+
+
+# Delivered in place of events a slow subscriber could not keep up with; the
+# stream ends and the client reconnects for a fresh snapshot.
+OVERFLOW: Final = _Overflow()
+
+
+class Subscription:
+    """One live connection's queue of events for a single user."""
+
+    def __init__(self, broker: "InProcessEventBroker", user_id: UUID, max_queued: int):
+        self.broker = broker
+        self.user_id = user_id
+        self._queue: asyncio.Queue[SessionEvent | _Overflow] = asyncio.Queue(max_queued)
+
+    async def get(self) -> SessionEvent | _Overflow:
+        return await self._queue.get()
+
+    def put(self, event: SessionEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(OVERFLOW)
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+
+class InProcessEventBroker:
+    """
+    Fans events out to the subscribers connected to this process.
+
+    Publishing is a dictionary lookup and a put per open connection; idle
+    subscribers cost a queue, not a query. Only sees events published by
+    the same worker.
+
+    Listeners see every event delivered to this worker, whatever its user;
+    per-process caches use them to drop entries another worker changed.
+    """
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self._listeners: list[Callable[[SessionEvent], None]] = []
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        subscription = Subscription(self, user_id, self.max_queued)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def add_listener(self, listener: Callable[[SessionEvent], None]) -> None:
+        """Call `listener` synchronously with every event this worker delivers."""
+        self._listeners.append(listener)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    async def publish(self, user_id: UUID, type: str, data: str) -> None:
+        self._deliver(SessionEvent(user_id, type, data))
+
+    def _deliver(self, event: SessionEvent) -> None:
+        for listener in self._listeners:
+            listener(event)
+        for subscription in self._subscribers.get(event.user_id, ()):
+            subscription.put(event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresEventBroker(InProcessEventBroker):
+    """
+    Relays events between workers through Postgres LISTEN/NOTIFY.
+
+    Each worker holds one dedicated connection that LISTENs on `channel`
+    and also sends this worker's NOTIFYs, so publishing never checks out a
+    pooled connection. Postgres delivers a notification to its own sender
+    too, so local subscribers are fed from the LISTEN side like everyone
+    else. When the connection is down, events reach local subscribers only.
+    """
+
+    def __init__(
+        self, engine: Callable[[], AsyncEngine], channel: str, max_queued: int, reconnect_seconds: float = 1.0
+    ):
+        super().__init__(max_queued)
+        self.engine = engine
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._driver_conn = None
+        # Tags this worker's NOTIFYs so it can tell them from other workers'.
+        self._origin = secrets.token_hex(8)
+        self._send_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def publish(self, user_id: UUID, type: str, data: str) -> None:
+        event = SessionEvent(user_id, type, data)
+        payload = json.dumps({"user_id": str(user_id), "type": type, "data": data, "origin": self._origin})
+        conn = self._driver_conn
+        if conn is None or len(payload.encode()) > _MAX_NOTIFY_PAYLOAD:
+            self._deliver(event)
+            return
+        try:
+            async with self._send_lock:
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception:
+            logger.warning("NOTIFY failed, delivering %s locally only", type, exc_info=True)
+            self._deliver(event)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self._deliver(SessionEvent(
+                UUID(message["user_id"]),
+                message["type"],
+                message["data"],
+                remote=message.get("origin") != self._origin,
+            ))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed session event on %s", channel)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="session-events-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self.engine().connect() as conn:
+                    driver_conn = (await conn.get_raw_connection()).driver_connection
+                    terminated = asyncio.Event()
+                    on_terminate = lambda _: terminated.set()
+                    driver_conn.add_termination_listener(on_terminate)
+                    await driver_conn.add_listener(self.channel, self._on_notify)
+                    self._driver_conn = driver_conn
+                    try:
+                        await terminated.wait()
+                    finally:
+                        self._driver_conn = None
+                        # The connection goes back to the pool; it must not
+                        # keep feeding this broker.
+                        driver_conn.remove_termination_listener(on_terminate)
+                        if not driver_conn.is_closed():
+                            await driver_conn.remove_listener(self.channel, self._on_notify)
+                logger.warning("Session event listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session event listener failed, reconnecting")
+            await asyncio.sleep(self.reconnect_seconds)
+
+
+def _build_broker() -> InProcessEventBroker:
+    if settings.SESSION_EVENTS_BROKER == SessionEventBrokerKind.postgres:
+        return PostgresEventBroker(
+            init_db, settings.SESSION_EVENTS_CHANNEL, max_queued=settings.SESSION_EVENTS_QUEUE_SIZE,
+        )
+    return InProcessEventBroker(max_queued=settings.SESSION_EVENTS_QUEUE_SIZE)
+
+
+session_events = _build_broker()
+
+
+def format_sse(event: str, data: str) -> str:
+    """One server-sent event; `data` must be single-line JSON."""
+    return f"event: {event}\ndata: {data}\n\n"
@@ -0,0 +1,161 @@
+"""
+Server-side expiry of abandoned focus sessions.
+
+A session whose client disappeared stays open forever and blocks the next
+`start`. Every `interval` seconds each worker tries to take a transaction-
+scoped advisory lock; the one that gets it closes, in batches of set-based
+UPDATEs, every open session past `started_at + duration_minutes + grace`.
+Expired sessions end at their planned end with `actual_duration` equal to
+the planned duration and count towards rollups, streaks and their linked
+task's pomodoros like any other completed session. One sweep can also be
+run by hand:
+
+    python -m app.services.session_expiry
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import Interval, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.neondb import AsyncSessionLocal, dispose_db, init_db
+from app.db.repositories import credit_task_pomodoros
+from app.models.focus_model import FocusSession
+from app.schemas.focus_session_schemas import FocusSessionResponse
+from app.services.active_sessions import active_session_store
+from app.services.rollups import apply_rollup_deltas, session_completion_delta
+from app.services.session_events import session_events
+from app.services.session_versions import session_versions
+from app.services.streaks import apply_streak_deltas
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock. A transaction-
+# scoped lock needs no dedicated connection and works behind PgBouncer.
+EXPIRY_LOCK_KEY = 0x6C6F6166_65787069  # "loafexpi"
+
+_ONE_MINUTE = literal(timedelta(minutes=1), Interval)
+
+
+async def expire_sessions(db: AsyncSession, grace: timedelta, batch_size: int) -> list[FocusSession]:
+    """
+    Close up to `batch_size` overdue open sessions with one UPDATE ... RETURNING.
+
+    Rows locked by a concurrent `complete`/`cancel` are skipped rather than
+    waited on. The caller owns the commit.
+    """
+    planned_end = FocusSession.started_at + FocusSession.duration_minutes * _ONE_MINUTE
+    overdue = (
+        select(FocusSession.id)
+        .where(
+            FocusSession.is_completed == False,
+            planned_end + literal(grace, Interval) < func.now(),
+        )
+        .order_by(FocusSession.started_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.scalars(
+        update(FocusSession)
+        .where(FocusSession.id.in_(overdue.scalar_subquery()))
+        .values(
+            is_completed=True,
+            ended_at=planned_end,
+            actual_duration=FocusSession.duration_minutes,
+            updated_at=func.now(),
+        )
+        .returning(FocusSession)
+    )
+    return result.all()
+
+
+async def sweep(
+    session_factory: async_sessionmaker[AsyncSession], grace: timedelta, batch_size: int
+) -> int | None:
+    """Expire every overdue session. Returns how many, or None when another worker holds the lock."""
+    total = 0
+    while True:
+        async with session_factory() as db:
+            if not await db.scalar(select(func.pg_try_advisory_xact_lock(EXPIRY_LOCK_KEY))):
+                return None if total == 0 else total
+            sessions = await expire_sessions(db, grace, batch_size)
+            deltas = [session_completion_delta(session) for session in sessions]
+            await apply_rollup_deltas(db, deltas)
+            await apply_streak_deltas(db, deltas)
+            await credit_task_pomodoros(db, sessions)
+            await db.commit()
+
+        for session in sessions:
+            await active_session_store.invalidate(session.user_id)
+            await session_versions.bump(session.user_id)
+            await session_events.publish(
+                session.user_id, "session.expired", FocusSessionResponse.model_validate(session).model_dump_json()
+            )
+        total += len(sessions)
+        if len(sessions) < batch_size:
+            return total
+
+
+class SessionExpiryScheduler:
+    """Runs `sweep` every `interval` seconds for the lifetime of the app."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        grace: timedelta,
+        batch_size: int,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.grace = grace
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="session-expiry")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                expired = await sweep(self.session_factory, self.grace, self.batch_size)
+            except Exception:
+                logger.exception("Session expiry sweep failed")
+                continue
+            if expired:
+                logger.info("Expired %d abandoned focus sessions", expired)
+
+
+session_expiry = SessionExpiryScheduler(
+    session_factory=AsyncSessionLocal,
+    interval=settings.SESSION_EXPIRY_INTERVAL_SECONDS,
+    grace=timedelta(minutes=settings.SESSION_EXPIRY_GRACE_MINUTES),
+    batch_size=settings.SESSION_EXPIRY_BATCH_SIZE,
+)
+
+
+async def _main() -> None:
+    init_db()
+    expired = await sweep(session_expiry.session_factory, session_expiry.grace, session_expiry.batch_size)
+    await dispose_db()
+    if expired is None:
+        print("Another process is running the sweep")
+    else:
+        print(f"Expired {expired} abandoned focus sessions")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
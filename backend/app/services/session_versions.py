@@ -0,0 +1,61 @@
+import itertools
+import secrets
+from typing import Protocol
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.session_events import SessionEvent, session_events
+from app.utils.ttl_cache import TTLCache
+
+
+class SessionVersionStore(Protocol):
+    """
+    Per-user version of everything the focus-session read endpoints return.
+
+    Writers bump it after committing; readers derive their ETag from it, so
+    a conditional GET can be answered without touching the database. A user
+    with no entry gets a fresh version, which never matches an ETag handed
+    out earlier.
+    """
+
+    async def current(self, user_id: UUID) -> str: ...
+
+    async def bump(self, user_id: UUID) -> str: ...
+
+
+class InMemorySessionVersionStore:
+    """
+    Per-process store. Versions come from one process-wide counter prefixed
+    with a random epoch, so they are never reused across entries or
+    restarts. A write made by another worker drops the user's version when
+    its `session.*` event arrives through the session event broker (which
+    must be `postgres` when running several workers); the TTL bounds
+    staleness if an event is lost.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._epoch = secrets.token_hex(4)
+        self._counter = itertools.count(1)
+        self._entries: TTLCache[UUID, str] = TTLCache(max_size, ttl_seconds)
+
+    async def current(self, user_id: UUID) -> str:
+        return self._entries.get(user_id) or self._assign(user_id)
+
+    async def bump(self, user_id: UUID) -> str:
+        return self._assign(user_id)
+
+    def on_session_event(self, event: SessionEvent) -> None:
+        if event.remote and event.type.startswith("session."):
+            self._entries.pop(event.user_id)
+
+    def _assign(self, user_id: UUID) -> str:
+        version = f"{self._epoch}-{next(self._counter)}"
+        self._entries.set(user_id, version)
+        return version
+
+
+session_versions = InMemorySessionVersionStore(
+    max_size=settings.SESSION_VERSION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SESSION_VERSION_TTL_SECONDS,
+)
+session_events.add_listener(session_versions.on_session_event)
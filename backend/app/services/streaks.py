@@ -0,0 +1,113 @@
+"""
+Streak maintenance.
+
+Completing a focus session updates the user's single `streaks` row with one
+atomic upsert (`apply_streak_deltas`). Broken streaks are reset for every
+user at once by a set-based nightly job:
+
+    python -m app.services.streaks reset
+"""
+import argparse
+import asyncio
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import case, func, literal_column, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.streak_model import Streak
+from app.services.rollups import RollupDelta
+
+
+async def apply_streak_deltas(db: AsyncSession, deltas: Iterable[RollupDelta]) -> None:
+    """
+    Fold completed focus sessions into each user's streak. The caller owns the commit.
+
+    Activity on the day after `last_activity_date` extends the streak, activity
+    on the same (or an earlier) day leaves it unchanged, anything later
+    restarts it at 1.
+    """
+    merged: dict[UUID, RollupDelta] = {}
+    for delta in deltas:
+        if not delta.sessions_completed:
+            continue
+        row = merged.get(delta.user_id)
+        if row is None:
+            merged[delta.user_id] = RollupDelta(
+                delta.user_id, delta.session_date, delta.focus_minutes, sessions_completed=delta.sessions_completed
+            )
+        else:
+            # ON CONFLICT cannot touch the same row twice in one statement.
+            row.session_date = max(row.session_date, delta.session_date)
+            row.focus_minutes += delta.focus_minutes
+            row.sessions_completed += delta.sessions_completed
+    if not merged:
+        return
+
+    stmt = insert(Streak).values([
+        {
+            "user_id": d.user_id,
+            "current_streak": 1,
+            "longest_streak": 1,
+            "last_activity_date": d.session_date,
+            "total_focus_minutes": d.focus_minutes,
+            "total_sessions_completed": d.sessions_completed,
+        }
+        for d in merged.values()
+    ])
+    table = Streak.__table__.c
+    day = stmt.excluded.last_activity_date
+    current = case(
+        (table.last_activity_date.is_(None), 1),
+        (table.last_activity_date >= day, func.greatest(table.current_streak, 1)),
+        # Inline literal: a bound `date - $1` is ambiguous to Postgres' operator resolution.
+        (table.last_activity_date == day - literal_column("1"), table.current_streak + 1),
+        else_=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "current_streak": current,
+            "longest_streak": func.greatest(table.longest_streak, current),
+            "last_activity_date": func.greatest(table.last_activity_date, day),
+            "total_focus_minutes": table.total_focus_minutes + stmt.excluded.total_focus_minutes,
+            "total_sessions_completed": table.total_sessions_completed + stmt.excluded.total_sessions_completed,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+_RESET_SQL = text("""
+UPDATE streaks
+SET current_streak = 0, updated_at = now()
+WHERE current_streak > 0
+  AND last_activity_date < (now() AT TIME ZONE :tz)::date - 1
+""")
+
+
+async def reset_broken_streaks(db: AsyncSession) -> int:
+    """Zero every streak whose last activity is before yesterday (in ACTIVITY_TIMEZONE). Returns rows reset."""
+    result = await db.execute(_RESET_SQL, {"tz": settings.ACTIVITY_TIMEZONE})
+    return result.rowcount
+
+
+async def _main() -> None:
+    from app.db.neondb import AsyncSessionLocal, dispose_db, init_db
+
+    parser = argparse.ArgumentParser(description="Streak maintenance")
+    parser.add_argument("command", choices=["reset"], help="reset: zero streaks broken before yesterday")
+    parser.parse_args()
+
+    init_db()
+    async with AsyncSessionLocal() as db:
+        reset = await reset_broken_streaks(db)
+        await db.commit()
+    await dispose_db()
+    print(f"Reset {reset} broken streaks")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
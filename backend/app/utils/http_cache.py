@@ -0,0 +1,30 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Responses are per user and must be revalidated on every use.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version: str, request: Request) -> str:
+    """Strong ETag for this URL (path and query) at the given data version."""
+    digest = hashlib.blake2b(
+        f"{version}|{request.url.path}|{request.url.query}".encode(), digest_size=12
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether `If-None-Match` lists `etag` (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
@@ -0,0 +1,29 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values: datetime | UUID | str | int | float) -> str:
+    """Encode the sort key of the last row on a page as an opaque URL-safe cursor."""
+    parts = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode a cursor produced by `encode_cursor`, converting each part to the given type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(parts, list) or len(parts) != len(types):
+            raise InvalidCursor("Malformed cursor")
+        return tuple(
+            datetime.fromisoformat(part) if t is datetime else t(part)
+            for part, t in zip(parts, types)
+        )
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
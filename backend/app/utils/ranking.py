@@ -0,0 +1,70 @@
+"""
+Lexicographic ranks for manually ordered rows.
+
+A rank is a string over `ALPHABET` (digits then lowercase letters, so byte
+order and alphabet order agree) that never ends in the smallest digit.
+Between any two distinct ranks there is always another, so moving an item
+rewrites only that item's rank instead of renumbering its siblings.
+"""
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+_BASE = len(ALPHABET)
+_INDEX = {char: i for i, char in enumerate(ALPHABET)}
+
+
+class InvalidRank(ValueError):
+    pass
+
+
+def _check(rank: str) -> None:
+    if not rank or rank[-1] == ALPHABET[0] or any(char not in _INDEX for char in rank):
+        raise InvalidRank(f"Invalid rank {rank!r}")
+
+
+def rank_between(before: str | None, after: str | None) -> str:
+    """
+    A rank sorting strictly after `before` and strictly before `after`; None
+    means unbounded on that side. The result is at most one character longer
+    than the longer neighbour.
+    """
+    for rank in (before, after):
+        if rank is not None:
+            _check(rank)
+    if before is not None and after is not None and before >= after:
+        raise InvalidRank(f"{before!r} does not sort before {after!r}")
+
+    low, high = before or "", after
+    digits = []
+    i = 0
+    while True:
+        lo = _INDEX[low[i]] if i < len(low) else 0
+        hi = _INDEX[high[i]] if high is not None and i < len(high) else _BASE
+        if lo == hi:
+            digits.append(ALPHABET[lo])
+        else:
+            mid = (lo + hi) // 2
+            if mid > lo:
+                digits.append(ALPHABET[mid])
+                return "".join(digits)
+            # Adjacent digits: keep the lower one, after which anything
+            # greater than the rest of `low` also sorts before `high`.
+            digits.append(ALPHABET[lo])
+            high = None
+        i += 1
+
+
+def spread_ranks(count: int) -> list[str]:
+    """`count` ascending ranks of equal length, evenly spaced to leave room for later moves."""
+    width = 1
+    while _BASE ** width <= count:
+        width += 1
+    step = _BASE ** width // (count + 1)
+    ranks = []
+    for n in range(1, count + 1):
+        value = n * step
+        chars = []
+        for _ in range(width):
+            value, digit = divmod(value, _BASE)
+            chars.append(ALPHABET[digit])
+        rank = "".join(reversed(chars))
+        ranks.append(rank if rank[-1] != ALPHABET[0] else rank + ALPHABET[_BASE // 2])
+    return ranks
@@ -0,0 +1,30 @@
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def schema_columns(entity: type, schema: type[BaseModel]) -> list:
+    """The `entity` columns backing each field of `schema`, for selecting rows instead of ORM objects."""
+    return [getattr(entity, name) for name in schema.model_fields]
+
+
+class ListSerializer:
+    """
+    Serializes query rows as a JSON array of `schema` in one pass.
+
+    The list TypeAdapter is built once, validates rows by attribute (so
+    `Row` tuples work as well as ORM objects) and writes JSON straight from
+    pydantic-core, skipping FastAPI's per-item response_model validation
+    and `jsonable_encoder` walk.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.adapter = TypeAdapter(list[schema])
+
+    def dump_json(self, rows: Iterable[Any]) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(rows, from_attributes=True))
+
+    def response(self, rows: Iterable[Any], headers: Mapping[str, str] | None = None) -> Response:
+        return Response(self.dump_json(rows), media_type="application/json", headers=headers)
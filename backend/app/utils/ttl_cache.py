@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Per-process LRU map whose entries expire `ttl_seconds` after they are set.
+
+    Holds at most `max_size` entries (0 disables the cache) and evicts the
+    least recently used first. `on_evict` is called with each entry dropped
+    because it expired or made room, not for `pop` or `clear`. Not
+    thread-safe; callers shared with worker threads hold their own lock.
+    """
+
+    def __init__(
+        self, max_size: int, ttl_seconds: float, on_evict: Callable[[K, V], None] | None = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._evicted(key, value)
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        """Store `value`, expiring after `ttl_seconds` (default: the cache's TTL)."""
+        if self.max_size == 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            oldest, (evicted, _) = self._entries.popitem(last=False)
+            self._evicted(oldest, evicted)
+
+    def pop(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evicted(self, key: K, value: V) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from bench.run import percentile
+from bench.users import PASSWORD, USERNAME_PREFIX
+
+# Streams assistant answers from many users at once against an app whose
+# CHAT_MODEL points at bench/fake_model.py, then reads the fake model's
+# call counters. That checks three things: the limiter (peak in-flight
+# calls and the 429/503 counts), the response cache (calls made versus
+# answers served) and streaming latency (time to first delta).
+
+CANNED_PROMPT = "Give me one tip for staying focused during a Pomodoro."
+
+
+async def stream_once(client: httpx.AsyncClient, headers: dict[str, str], prompt: str) -> tuple[int, float | None, float]:
+    """(status, seconds to first delta, total seconds) for one streamed answer."""
+    started = time.perf_counter()
+    first_delta = None
+    async with client.stream("POST", "/chat/messages/stream", headers=headers, json={"content": prompt}) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return response.status_code, None, time.perf_counter() - started
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line.removeprefix("event: ")
+            elif event == "delta" and first_delta is None:
+                first_delta = time.perf_counter() - started
+            elif event == "error":
+                return 500, first_delta, time.perf_counter() - started
+    return response.status_code, first_delta, time.perf_counter() - started
+
+
+async def virtual_user(
+    client: httpx.AsyncClient, username: str, requests: int, canned_ratio: float, results: list,
+) -> None:
+    response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": response.json()["access_token"]}
+    for i in range(requests):
+        prompt = CANNED_PROMPT if random.random() < canned_ratio else f"{username} question {i}: explain spaced repetition"
+        results.append(await stream_once(client, headers, prompt))
+
+
+async def run(base_url: str, model_url: str, concurrency: int, requests: int, canned_ratio: float) -> None:
+    results: list[tuple[int, float | None, float]] = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        before = (await client.get(f"{model_url}/stats")).json()
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(client, f"{USERNAME_PREFIX}{i + 1}", requests, canned_ratio, results)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        after = (await client.get(f"{model_url}/stats")).json()
+
+    statuses = Counter(status for status, _, _ in results)
+    served = statuses[200]
+    calls = after["calls"] - before["calls"]
+    first = sorted(t * 1000 for status, t, _ in results if status == 200 and t is not None)
+    total = sorted(t * 1000 for status, _, t in results if status == 200)
+    print(json.dumps({
+        "elapsed_s": round(elapsed, 2),
+        "statuses": dict(statuses),
+        "answers_served": served,
+        "model_calls": calls,
+        "cache_saved_calls": served - calls,
+        "max_in_flight_model_calls": after["max_in_flight"],
+        "first_delta_p50_ms": percentile(first, 50),
+        "first_delta_p95_ms": percentile(first, 95),
+        "total_p50_ms": percentile(total, 50),
+        "total_p95_ms": percentile(total, 95),
+    }, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream concurrent assistant answers against a fake model")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--model-url", default="http://127.0.0.1:9100", help="bench.fake_model server")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users (seeded users 1..N)")
+    parser.add_argument("--requests", type=int, default=5, help="answers streamed per user")
+    parser.add_argument("--canned-ratio", type=float, default=0.5, help="share of prompts that are identical")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.model_url, args.concurrency, args.requests, args.canned_ratio))
+
+
+if __name__ == "__main__":
+    main()
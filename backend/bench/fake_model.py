@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# A stand-in for an OpenAI-compatible chat completions API with a fixed
+# latency, for exercising the assistant's limiter, cache and streaming
+# without a real provider. GET /stats reports how many calls arrived and
+# the most that were ever in flight at once.
+
+app = FastAPI()
+config = argparse.Namespace(first_token_ms=300.0, token_ms=30.0, tokens=40)
+stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def _words(n: int) -> list[str]:
+    return [f"word{i} " for i in range(n)]
+
+
+def _usage(completion_tokens: int) -> dict:
+    return {"prompt_tokens": 10, "completion_tokens": completion_tokens, "total_tokens": 10 + completion_tokens}
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str | None = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    words = _words(config.tokens)
+
+    stats["calls"] += 1
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    if not body.get("stream"):
+        try:
+            await asyncio.sleep((config.first_token_ms + config.token_ms * len(words)) / 1000)
+        finally:
+            stats["in_flight"] -= 1
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(len(words)),
+        })
+
+    async def events():
+        try:
+            await asyncio.sleep(config.first_token_ms / 1000)
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for word in words:
+                yield _chunk(completion_id, model, {"content": word})
+                await asyncio.sleep(config.token_ms / 1000)
+            yield _chunk(completion_id, model, {}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [], "usage": _usage(len(words))}
+                yield f"data: {json.dumps(usage)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            stats["in_flight"] -= 1
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI-compatible chat model")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--first-token-ms", type=float, default=config.first_token_ms)
+    parser.add_argument("--token-ms", type=float, default=config.token_ms)
+    parser.add_argument("--tokens", type=int, default=config.tokens)
+    args = parser.parse_args()
+
+    config.first_token_ms, config.token_ms, config.tokens = args.first_token_ms, args.token_ms, args.tokens
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
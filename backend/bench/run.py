@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from bench.users import PASSWORD, USERNAME_PREFIX
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+DEFAULT_OUTPUT = RESULTS_DIR / "latest.json"
+
+SESSIONS = "/focussession/focus-sessions"
+_DB_TIMING = re.compile(r"db;dur=([\d.]+)")
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    db_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "db_p95_ms": percentile(sorted(self.db_ms), 95),
+        }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return round(sorted_values[int(rank) - 1], 2)
+
+
+class Recorder:
+    def __init__(self):
+        self.stats: dict[str, EndpointStats] = {}
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str,
+        expected: tuple[int, ...] = (200,), **kwargs,
+    ) -> httpx.Response:
+        stats = self.stats.setdefault(name, EndpointStats())
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.errors += 1
+            raise
+        stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+        if match := _DB_TIMING.search(response.headers.get("server-timing", "")):
+            stats.db_ms.append(float(match.group(1)))
+        if response.status_code not in expected:
+            stats.errors += 1
+        return response
+
+
+# ============ SCENARIO ============
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, username: str) -> dict[str, str]:
+    response = await recorder.request(
+        client, "POST /auth/login", "POST", "/auth/login",
+        json={"username": username, "password": PASSWORD},
+    )
+    response.raise_for_status()
+    return {"Authorization": response.json()["access_token"]}
+
+
+async def virtual_user(
+    client: httpx.AsyncClient, recorder: Recorder, username: str,
+    deadline: float, login_every: int, distractions: int,
+) -> None:
+    """One focus session per iteration, the way the timer client drives the API."""
+    headers = await login(client, recorder, username)
+    # A previous run may have left this user's session open.
+    await client.delete(f"{SESSIONS}/cancel", headers=headers)
+
+    iteration = 0
+    while time.perf_counter() < deadline:
+        iteration += 1
+        if iteration % login_every == 0:
+            headers = await login(client, recorder, username)
+
+        await recorder.request(client, "POST /focus-sessions/start", "POST", f"{SESSIONS}/start",
+                               expected=(201,), headers=headers, json={"duration_minutes": 25})
+        await recorder.request(client, "GET /focus-sessions/active", "GET", f"{SESSIONS}/active", headers=headers)
+        for _ in range(distractions):
+            await recorder.request(client, "POST /focus-sessions/distractions", "POST", f"{SESSIONS}/distractions",
+                                   expected=(202,), headers=headers,
+                                   json={"distraction_type": random.choice(("tab_switch", "app_switch", "idle"))})
+        await recorder.request(client, "POST /focus-sessions/distractions/batch", "POST",
+                               f"{SESSIONS}/distractions/batch", expected=(201,), headers=headers,
+                               json={"items": [{"distraction_type": "idle", "duration_seconds": 30}] * 5})
+        await recorder.request(client, "GET /focus-sessions/distractions", "GET", f"{SESSIONS}/distractions",
+                               headers=headers)
+        await recorder.request(client, "PATCH /focus-sessions/complete", "PATCH", f"{SESSIONS}/complete",
+                               headers=headers)
+        await recorder.request(client, "GET /focus-sessions/history", "GET", f"{SESSIONS}/history",
+                               headers=headers, params={"limit": 20})
+
+
+async def run(base_url: str, concurrency: int, duration: float, login_every: int, distractions: int, users: int) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        results = await asyncio.gather(*(
+            virtual_user(client, recorder, f"{USERNAME_PREFIX}{i % users + 1}", deadline, login_every, distractions)
+            for i in range(concurrency)
+        ), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    for failure in failures[:5]:
+        print(f"virtual user failed: {failure!r}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "duration_seconds": round(elapsed, 2),
+            "login_every": login_every,
+            "distractions_per_session": distractions,
+            "failed_virtual_users": len(failures),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "endpoints": {name: stats.summary(elapsed) for name, stats in sorted(recorder.stats.items())},
+    }
+
+
+# ============ REPORTING ============
+
+def print_report(results: dict) -> None:
+    print(f"{'endpoint':<42} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'db p95':>8}")
+    for name, s in results["endpoints"].items():
+        print(
+            f"{name:<42} {s['requests']:>7} {s['errors']:>5} {s['throughput_rps']:>8} "
+            f"{s['p50_ms'] or '-':>8} {s['p95_ms'] or '-':>8} {s['p99_ms'] or '-':>8} {s['db_p95_ms'] or '-':>8}"
+        )
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Endpoints whose p95 latency rose or throughput fell by more than `tolerance`."""
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = results["endpoints"].get(name)
+        if current is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if base["p95_ms"] and current["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} rps")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive the running API with concurrent virtual users")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--users", type=int, default=1_000, help="seeded users to draw from")
+    parser.add_argument("--login-every", type=int, default=10, help="log in again every N sessions")
+    parser.add_argument("--distractions", type=int, default=3, help="single distractions logged per session")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(
+        args.base_url, args.concurrency, args.duration, args.login_every, args.distractions, args.users,
+    ))
+    print_report(results)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
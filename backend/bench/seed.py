@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.config import ModeEnum, settings
+from app.core.security import hash_password
+from app.db.neondb import AsyncSessionLocal, dispose_db, init_db
+from app.services.rollups import rebuild_rollups
+from bench.users import PASSWORD, USERNAME_PREFIX
+
+# Users, their completed sessions and each session's distractions in one
+# set-based statement per chunk. Usernames that already exist are skipped, so
+# re-running with a larger --users only adds the missing tail.
+_SEED_SQL = text("""
+WITH new_users AS (
+    INSERT INTO users (id, username, email, hashed_password, created_at)
+    SELECT gen_random_uuid(), :prefix || n, :prefix || n || '@bench.local', :hashed_password, now()
+    FROM generate_series(:first, :last) AS n
+    ON CONFLICT DO NOTHING
+    RETURNING id
+),
+planned_sessions AS (
+    SELECT
+        u.id AS user_id,
+        now() - random() * make_interval(days => :days) AS started_at,
+        10 + floor(random() * 40)::int AS minutes
+    FROM new_users u
+    CROSS JOIN generate_series(1, :sessions_per_user)
+),
+new_sessions AS (
+    INSERT INTO focus_sessions (
+        id, user_id, duration_minutes, break_duration_minutes, session_type,
+        started_at, ended_at, actual_duration, is_completed, created_at
+    )
+    SELECT
+        gen_random_uuid(), user_id, 25, 5, 'focus',
+        started_at, started_at + make_interval(mins => minutes), minutes, true, started_at
+    FROM planned_sessions
+    RETURNING id, started_at, actual_duration
+)
+INSERT INTO distractions (
+    id, focus_session_id, distraction_type, source_app, duration_seconds, occured_at, created_at
+)
+SELECT
+    gen_random_uuid(),
+    s.id,
+    (ARRAY['tab_switch', 'app_switch', 'idle', 'blocked_site'])[1 + floor(random() * 4)::int],
+    (ARRAY['browser', 'slack', 'discord', 'mail'])[1 + floor(random() * 4)::int],
+    5 + floor(random() * 120)::int,
+    s.started_at + random() * make_interval(mins => s.actual_duration),
+    s.started_at
+FROM new_sessions s
+CROSS JOIN generate_series(1, :distractions_per_session)
+""")
+
+
+async def seed(users: int, sessions_per_user: int, distractions_per_session: int, days: int, chunk_size: int, seed: float) -> None:
+    # One bcrypt hash shared by every synthetic user; hashing per user would
+    # dominate seeding time.
+    hashed_password = hash_password(PASSWORD)
+
+    for first in range(1, users + 1, chunk_size):
+        last = min(first + chunk_size - 1, users)
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+            await db.execute(_SEED_SQL, {
+                "prefix": USERNAME_PREFIX,
+                "first": first,
+                "last": last,
+                "hashed_password": hashed_password,
+                "days": days,
+                "sessions_per_user": sessions_per_user,
+                "distractions_per_session": distractions_per_session,
+            })
+            await db.commit()
+        print(f"Seeded users {first}-{last}")
+
+    async with AsyncSessionLocal() as db:
+        written = await rebuild_rollups(db)
+        await db.commit()
+    print(f"Rebuilt {written} daily rollups")
+
+
+async def reset() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("TRUNCATE users RESTART IDENTITY CASCADE"))
+        await db.commit()
+    print("Truncated users and everything referencing them")
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the benchmark database with synthetic data")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--sessions-per-user", type=int, default=50)
+    parser.add_argument("--distractions-per-session", type=int, default=5)
+    parser.add_argument("--days", type=int, default=90, help="spread sessions over this many past days")
+    parser.add_argument("--chunk-size", type=int, default=500, help="users per transaction")
+    parser.add_argument("--seed", type=float, default=0.42, help="setseed() value in [-1, 1] for reproducible data")
+    parser.add_argument("--reset", action="store_true", help="truncate all user data before seeding")
+    args = parser.parse_args()
+
+    if settings.MODE == ModeEnum.production:
+        parser.error("refusing to seed synthetic data with MODE=production")
+
+    init_db()
+    if args.reset:
+        await reset()
+    await seed(
+        args.users, args.sessions_per_user, args.distractions_per_session,
+        args.days, args.chunk_size, args.seed,
+    )
+    await dispose_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
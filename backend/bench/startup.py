@@ -0,0 +1,56 @@
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Import cost of the application module, measured in a fresh interpreter
+# with `-X importtime` and no DATABASE_URL (importing must not need one).
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def measure(module: str) -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) for every import, as reported by -X importtime."""
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure and budget the app's cold import time")
+    parser.add_argument("--module", default="app.api.api")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="fail when the import takes longer")
+    parser.add_argument("--runs", type=int, default=5, help="report the fastest of this many runs")
+    parser.add_argument("--top", type=int, default=15, help="show the slowest top-level imports")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda rows: next(cum for _, cum, name in rows if name.strip() == args.module))
+    total_ms = next(cum for _, cum, name in best if name.strip() == args.module) / 1000
+
+    # Direct dependencies of the process (depth 1 in importtime's indented tree).
+    top_level = [(cum, name.strip()) for _, cum, name in best if not name.startswith("  ")]
+    print(f"{'cumulative ms':>14}  module")
+    for cum, name in sorted(top_level, reverse=True)[:args.top]:
+        print(f"{cum / 1000:>14.1f}  {name}")
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
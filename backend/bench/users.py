@@ -0,0 +1,5 @@
+# Credentials shared by bench.seed (which creates the users) and bench.run
+# (which logs in as them); kept import-free so the load generator does not
+# need the app's settings.
+USERNAME_PREFIX = "bench_user_"
+PASSWORD = "bench-password"
@@ -0,0 +1,166 @@
+"""
+Statement counts per endpoint, read from the request instrumentation.
+
+Every request here also runs under its declared `query_budget`, which the
+testing mode enforces. The exact counts pin write paths to single round
+trips (no SELECT-before-INSERT, no refresh after commit) and list endpoints
+to a fixed number of statements however many rows they return.
+"""
+import httpx
+import pytest
+
+from app.core.instrumentation import RequestMetrics, capture_requests
+
+pytestmark = pytest.mark.anyio
+
+SESSIONS = "/focussession/focus-sessions"
+
+
+async def send(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple[httpx.Response, RequestMetrics]:
+    """Issue one request and return it with the metrics recorded for it."""
+    with capture_requests() as captured:
+        response = await client.request(method, url, **kwargs)
+    [metrics] = captured
+    return response, metrics
+
+
+async def warm_principal(client: httpx.AsyncClient, headers: dict[str, str]) -> None:
+    """Cache the user's principal so later counts exclude the auth lookup."""
+    response = await client.get("/tasks/next", headers=headers)
+    response.raise_for_status()
+
+
+# ============ AUTH ============
+
+async def test_register_is_a_single_insert(client):
+    user = {"email": "single_insert@example.com", "username": "single_insert", "password": "test-password"}
+    await client.post("/auth/register", json=user)  # may already exist from an earlier run
+
+    response, metrics = await send(client, "POST", "/auth/register", json=user)
+    assert response.status_code == 400
+    assert metrics.queries == 1
+
+
+async def test_login_is_a_single_select(client, credentials):
+    response, metrics = await send(client, "POST", "/auth/login", json=credentials)
+    assert response.status_code == 200
+    assert metrics.queries == 1
+
+
+async def test_budget_covers_the_auth_lookup(client, auth_headers):
+    response, metrics = await send(client, "GET", f"{SESSIONS}/active", headers=auth_headers)
+    assert response.status_code == 404
+    assert metrics.queries == metrics.query_budget == 2
+
+    response, metrics = await send(client, "GET", f"{SESSIONS}/active", headers=auth_headers)
+    assert response.status_code == 404
+    assert metrics.queries == 1
+
+
+# ============ FOCUS SESSIONS ============
+
+async def test_session_lifecycle_round_trips(client, auth_headers):
+    await warm_principal(client, auth_headers)
+
+    response, metrics = await send(client, "POST", f"{SESSIONS}/start", headers=auth_headers, json={})
+    assert response.status_code == 201
+    assert metrics.queries == 1
+
+    response, metrics = await send(client, "GET", f"{SESSIONS}/active", headers=auth_headers)
+    assert response.status_code == 200
+    assert metrics.queries == 0
+
+    response, metrics = await send(
+        client, "POST", f"{SESSIONS}/distractions", headers=auth_headers, json={"distraction_type": "tab_switch"}
+    )
+    assert response.status_code == 202
+    assert metrics.queries == 0
+
+    items = [{"distraction_type": "idle", "duration_seconds": 30}] * 3
+    response, metrics = await send(
+        client, "POST", f"{SESSIONS}/distractions/batch", headers=auth_headers, json={"items": items}
+    )
+    assert response.status_code == 201
+    assert metrics.queries == 2  # INSERT ... RETURNING, rollup upsert
+
+    # The buffered distraction is flushed first, outside the budget.
+    response, metrics = await send(client, "GET", f"{SESSIONS}/distractions", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+    assert metrics.queries == 1
+
+    response, metrics = await send(client, "PATCH", f"{SESSIONS}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    assert metrics.queries == 3  # UPDATE ... RETURNING, rollup upsert, streak upsert
+
+
+async def test_cancel_round_trips(client, auth_headers):
+    await warm_principal(client, auth_headers)
+    await client.post(f"{SESSIONS}/start", headers=auth_headers, json={})
+    await client.post(
+        f"{SESSIONS}/distractions/batch", headers=auth_headers, json={"items": [{"distraction_type": "idle"}] * 2}
+    )
+
+    response, metrics = await send(client, "DELETE", f"{SESSIONS}/cancel", headers=auth_headers)
+    assert response.status_code == 204
+    assert metrics.queries == 3  # DELETE distractions RETURNING, DELETE session, rollup correction
+
+
+async def test_conditional_history_skips_the_database(client, auth_headers):
+    await warm_principal(client, auth_headers)
+
+    response, metrics = await send(client, "GET", f"{SESSIONS}/history", headers=auth_headers)
+    assert response.status_code == 200
+    assert metrics.queries == 1
+
+    headers = auth_headers | {"If-None-Match": response.headers["ETag"]}
+    response, metrics = await send(client, "GET", f"{SESSIONS}/history", headers=headers)
+    assert response.status_code == 304
+    assert metrics.queries == 0
+
+
+# ============ TASKS ============
+
+async def test_task_list_is_two_statements_at_any_size(client, auth_headers):
+    await warm_principal(client, auth_headers)
+    for n in range(5):
+        response = await client.post(
+            "/tasks",
+            headers=auth_headers,
+            json={"title": f"Task {n}", "subtasks": [{"title": f"Step {i}"} for i in range(n + 1)]},
+        )
+        assert response.status_code == 201
+
+        response, metrics = await send(client, "GET", "/tasks", headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == n + 1
+        assert metrics.queries == 2  # tasks, then every subtask in one IN query
+
+
+async def test_subtask_append_and_move_write_one_row(client, auth_headers):
+    await warm_principal(client, auth_headers)
+    response = await client.post(
+        "/tasks", headers=auth_headers, json={"title": "Essay", "subtasks": [{"title": "Outline"}, {"title": "Draft"}]}
+    )
+    task = response.json()
+    outline, draft = task["subtasks"]
+
+    response, metrics = await send(
+        client, "POST", f"/tasks/{task['id']}/subtasks", headers=auth_headers, json={"title": "Sources"}
+    )
+    assert response.status_code == 201
+    assert metrics.queries == 2  # last rank, INSERT
+    sources = response.json()
+
+    response, metrics = await send(
+        client,
+        "POST",
+        f"/tasks/{task['id']}/subtasks/{sources['id']}/move",
+        headers=auth_headers,
+        json={"after_id": outline["id"], "before_id": draft["id"]},
+    )
+    assert response.status_code == 200
+    assert metrics.queries == 2  # neighbour ranks, UPDATE ... RETURNING
+
+    response = await client.get(f"/tasks/{task['id']}", headers=auth_headers)
+    assert [subtask["title"] for subtask in response.json()["subtasks"]] == ["Outline", "Sources", "Draft"]
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_due_dates_keep_their_offset(client, auth_headers):
+    response = await client.post(
+        "/tasks", headers=auth_headers, json={"title": "Submit essay", "due_date": "2026-10-20T17:00:00Z"}
+    )
+    assert response.status_code == 201
+    task = response.json()
+    assert datetime.fromisoformat(task["due_date"]) == datetime(2026, 10, 20, 17, tzinfo=timezone.utc)
+
+    response = await client.patch(
+        f"/tasks/{task['id']}", headers=auth_headers, json={"due_date": "2026-10-21T09:30:00+02:00"}
+    )
+    assert response.status_code == 200
+    assert datetime.fromisoformat(response.json()["due_date"]) == datetime(2026, 10, 21, 7, 30, tzinfo=timezone.utc)